@@ -0,0 +1,29 @@
+"""Add tokens_valid_after to users
+
+Revision ID: 5b1d2f7c9a43
+Revises: e69e73e156d7
+Create Date: 2026-10-18 10:12:41.508316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1d2f7c9a43"
+down_revision: Union[str, None] = "e69e73e156d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("tokens_valid_after", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "tokens_valid_after")
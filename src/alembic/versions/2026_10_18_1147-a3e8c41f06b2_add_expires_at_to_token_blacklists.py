@@ -0,0 +1,36 @@
+"""Add expires_at to token_blacklists
+
+Revision ID: a3e8c41f06b2
+Revises: 5b1d2f7c9a43
+Create Date: 2026-10-18 11:47:09.216734
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3e8c41f06b2"
+down_revision: Union[str, None] = "5b1d2f7c9a43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("token_blacklists", sa.Column("expires_at", sa.DateTime(), nullable=True))
+    op.create_index(
+        "ix_token_blacklist_expires_at",
+        "token_blacklists",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_token_blacklist_expires_at", table_name="token_blacklists")
+    op.drop_column("token_blacklists", "expires_at")
@@ -0,0 +1,32 @@
+"""Add revoked_at index to token_blacklists
+
+Revision ID: c7d19f4b2e60
+Revises: a3e8c41f06b2
+Create Date: 2026-10-18 15:30:41.508217
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d19f4b2e60"
+down_revision: Union[str, None] = "a3e8c41f06b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_token_blacklist_revoked_at",
+        "token_blacklists",
+        ["revoked_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_token_blacklist_revoked_at", table_name="token_blacklists")
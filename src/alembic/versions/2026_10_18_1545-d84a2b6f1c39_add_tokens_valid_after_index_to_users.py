@@ -0,0 +1,32 @@
+"""Add tokens_valid_after index to users
+
+Revision ID: d84a2b6f1c39
+Revises: c7d19f4b2e60
+Create Date: 2026-10-18 15:45:12.730964
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d84a2b6f1c39"
+down_revision: Union[str, None] = "c7d19f4b2e60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_users_tokens_valid_after"),
+        "users",
+        ["tokens_valid_after"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_users_tokens_valid_after"), table_name="users")
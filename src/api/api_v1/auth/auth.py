@@ -1,18 +1,31 @@
 import logging
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, OAuth2PasswordRequestForm
 from pydantic import SecretStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.models import User
 from core.models.db_helper import db_helper
-from core.schemas.auth import AuthUser, TokenInfo
-from core.schemas.users import UserRead
-from crud.auth import get_all_users, get_auth_user, get_user_by_id, revoke_all_user_tokens, revoke_token
-
-from .utils import get_access_token, get_current_token_payload, get_refresh_token, get_user_id, rate_limited
+from core.schemas.auth import TokenInfo
+from core.schemas.users import UserProfile, UserRead, UsersPage
+from core.settings import settings
+from crud.auth import get_all_users, get_auth_user, revoke_all_user_tokens, revoke_token
+
+from .utils import (
+    CurrentPrincipal,
+    MePrincipal,
+    RefreshPrincipal,
+    check_login_backoff,
+    decode_cursor,
+    encode_cursor,
+    get_access_token,
+    get_token_pair,
+    profile_claims,
+    record_login_failure,
+    reset_login_failures,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,32 +40,36 @@ router = APIRouter(dependencies=[Depends(http_bearer)])
     response_model=TokenInfo,
     response_model_exclude_none=True,
 )
-@rate_limited(max_calls=5, time_frame=60)
 async def login(
     request: Request,
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> TokenInfo:
     client_ip = request.client.host
+    # Отсекаем перебор до загрузки пользователя и до работы Argon2
+    check_login_backoff(form_data.username, client_ip)
     try:
         user = await get_auth_user(
             session,
             form_data.username,
             SecretStr(form_data.password),
         )
+        reset_login_failures(form_data.username)
 
         jwt_payload = {
             "sub": str(user.id),
             "username": user.nickname,
+            **profile_claims(user),
         }
-        access_token = await get_access_token(session, jwt_payload, request)
-        refresh_token = await get_refresh_token(session, jwt_payload, request)
+        access_token, refresh_token = await get_token_pair(session, jwt_payload, request)
 
         return TokenInfo(
             access_token=access_token,
             refresh_token=refresh_token,
         )
     except HTTPException as exc:
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            record_login_failure(form_data.username, client_ip)
         logger.warning(f"Failed login attempt from {client_ip}: {exc.detail}")
         raise
     except Exception as exc:
@@ -69,14 +86,14 @@ async def login(
 )
 async def logout(
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    access_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
+    principal: CurrentPrincipal,
     logout_all: bool = False,
 ) -> dict[str, str]:
-    user_id = await get_user_id(session, access_payload, "access")
+    access_payload = principal.token_payload
     if logout_all:
         await revoke_all_user_tokens(
             session=session,
-            user_id=user_id,
+            user_id=principal.id,
             reason="user_logout_all",
         )
         message = "All sessions terminated successfully"
@@ -85,6 +102,8 @@ async def logout(
             session=session,
             token_jti=access_payload.get("jti", ""),
             reason="user_logout",
+            user_id=principal.id,
+            expires_at=access_payload.get("exp"),
         )
         message = "Logged out successfully"
 
@@ -103,13 +122,13 @@ async def logout(
 async def refresh_jwt(
     request: Request,
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    refresh_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
+    principal: RefreshPrincipal,
 ) -> TokenInfo:
-    user_id = await get_user_id(session, refresh_payload, "refresh")
-    user = await get_user_by_id(session, user_id)
     jwt_payload = {
-        "sub": str(user.id),
-        "username": user.nickname,
+        "sub": str(principal.id),
+        "username": principal.profile.nickname,
+        "fid": principal.token_payload.get("jti"),
+        **profile_claims(principal.profile),
     }
     access_token = await get_access_token(session, jwt_payload, request)
     return TokenInfo(
@@ -120,33 +139,37 @@ async def refresh_jwt(
 @router.get(
     "/me",
     status_code=status.HTTP_200_OK,
-    response_model=AuthUser,
-    response_model_exclude={"id", "password"},
+    response_model=UserProfile,
+    response_model_exclude={"id"},
     response_model_exclude_none=True,
 )
 async def me(
-    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    access_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
-) -> AuthUser:
-    user_id = await get_user_id(session, access_payload, "access")
-    user = await get_user_by_id(session, user_id)
-    return AuthUser.model_validate(user)
+    principal: MePrincipal,
+) -> UserProfile:
+    return principal.profile
 
 
 @router.get(
     "/all_users",
-    response_model=list[UserRead],
+    response_model=UsersPage,
     status_code=status.HTTP_200_OK,
 )
 async def all_users(
     session: Annotated[AsyncSession, Depends(db_helper.get_session)],
-    access_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
-) -> list[User]:
-    user_id = await get_user_id(session, access_payload, "access")
-    user = await get_user_by_id(session, user_id)
-    if not user.is_superuser:
+    principal: CurrentPrincipal,
+    limit: Annotated[int, Query(ge=1, le=settings.pagination.max_limit)] = settings.pagination.default_limit,
+    cursor: str | None = None,
+) -> UsersPage:
+    if not principal.is_superuser:
         raise HTTPException(
             status.HTTP_403_FORBIDDEN,
             detail="Forbidden: superuser only",
         )
-    return await get_all_users(session)
+    after_id = decode_cursor(cursor) if cursor else None
+    # Лишняя строка показывает, есть ли следующая страница
+    users = await get_all_users(session, limit + 1, after_id)
+    page = [UserRead.model_validate(user) for user in users[:limit]]
+    return UsersPage(
+        items=page,
+        next_cursor=encode_cursor(page[-1].id) if len(users) > limit else None,
+    )
@@ -1,24 +1,48 @@
+import base64
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
-from functools import wraps
 from typing import Annotated, Any
 
 import jwt
 from fastapi import Depends, HTTPException, Request
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordBearer
 from jwt import InvalidTokenError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from core.models import User
+from core.models.db_helper import db_helper
 from core.schemas.auth import TokenType
+from core.schemas.users import UserProfile
 from core.settings import settings
-from crud.auth import create_jwt_record, is_token_revoked
+from core.utils.backoff import FailureBackoff
+from core.utils.jwt_signer import jwt_crypto, jwt_signer
+from core.utils.rate_limit import create_rate_limit_store
+from crud.auth import (
+    USER_SNAPSHOTS,
+    VERIFIED_TOKENS_CACHE,
+    Principal,
+    create_jwt_record,
+    get_principal,
+)
 
 logger = logging.getLogger(__name__)
 
-# Простой in-memory rate limiter (использовать Redis)
-RATE_LIMIT_DATA: dict[str, list[datetime]] = {}
+# Скользящее окно по двум счётчикам на ключ (маршрут + IP клиента)
+RATE_LIMIT_DATA = create_rate_limit_store(
+    backend=settings.rate_limit.backend,
+    path=settings.shared_state.path,
+)
+
+LOGIN_FAILURES = FailureBackoff(
+    base_delay=settings.login_backoff.base_delay_seconds,
+    max_delay=settings.login_backoff.max_delay_seconds,
+    forget_after=settings.login_backoff.forget_after_seconds,
+    max_entries=settings.login_backoff.max_entries,
+)
+
+MAX_CURSOR_ID = 2**63 - 1
 
 oauth2_scheme = OAuth2PasswordBearer(
     settings.auth_jwt.token_url,
@@ -29,61 +53,86 @@ def encode_jwt(
     payload: dict[str, Any],
     expires_in: timedelta,
     jti: str,
-    private_key: str = settings.auth_jwt.private_key,
-    algorithm: str = settings.auth_jwt.algorithm,
+    private_key: str | None = None,
+    algorithm: str | None = None,
 ) -> str:
+    now = datetime.now(timezone.utc)
     to_encode = payload.copy()
     to_encode.update(
-        iat=datetime.now(timezone.utc),
-        exp=datetime.now(timezone.utc) + expires_in,
+        iat=now,
+        exp=now + expires_in,
         jti=jti,
     )
+    # Ключ из настроек уже загружен в jwt_signer, PEM разбирается только для явно переданного ключа
+    if private_key is None and algorithm is None:
+        return jwt_signer.encode(to_encode)
     jwt_encoded = jwt.encode(
         to_encode,
-        private_key,
-        algorithm,
+        private_key or settings.auth_jwt.private_key,
+        algorithm or settings.auth_jwt.algorithm,
     )
     return jwt_encoded
 
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.auth_jwt.public_key,
-    algorithm: str = settings.auth_jwt.algorithm,
+    public_key: str | None = None,
+    algorithm: str | None = None,
 ) -> Any:
+    if public_key is None and algorithm is None:
+        return jwt_signer.decode(token)
     jwt_decoded = jwt.decode(
         jwt=token,
-        key=public_key,
-        algorithms=[algorithm],
+        key=public_key or settings.auth_jwt.public_key,
+        algorithms=[algorithm or settings.auth_jwt.algorithm],
     )
     return jwt_decoded
 
 
+def profile_claims(user: User | UserProfile) -> dict[str, Any]:
+    if not settings.auth_jwt.profile_claims:
+        return {}
+    return {"profile": UserProfile.model_validate(user).model_dump(exclude={"id"})}
+
+
+def profile_from_claims(token_payload: dict[str, Any], user_id: int) -> UserProfile | None:
+    """Профиль из клеймов access-токена, если пользователь не менялся после выдачи токена."""
+    claims = token_payload.get("profile")
+    issued_at = token_payload.get("iat")
+    if not settings.auth_jwt.profile_claims or not isinstance(claims, dict) or not isinstance(issued_at, int):
+        return None
+    if USER_SNAPSHOTS.changed_since(user_id, issued_at):
+        return None
+    profile = UserProfile.model_validate({**claims, "id": user_id})
+    return profile if profile.is_active else None
+
+
 async def create_jwt(
     session: AsyncSession,
     token_type: TokenType,
     token_payload: dict[str, Any],
     expires: int,
     request: Request | None = None,
+    jti: str | None = None,
+    commit: bool = True,
 ) -> str:
     jwt_payload = {
         "type": token_type,
     }
     jwt_payload.update(token_payload)
     expire_in = timedelta(minutes=expires)
-    jti = str(uuid.uuid4())
-    await create_jwt_record(
-        session=session,
-        jti=jti,
-        user_id=token_payload["sub"],
-        token_type=token_type,
-        request=request,
-    )
-    return encode_jwt(
-        jwt_payload,
-        expires_in=expire_in,
-        jti=jti,
-    )
+    jti = jti or str(uuid.uuid4())
+    if token_type == "refresh" or settings.auth_jwt.persist_access_tokens:  # noqa: S105
+        await create_jwt_record(
+            session=session,
+            jti=jti,
+            user_id=token_payload["sub"],
+            token_type=token_type,
+            request=request,
+            commit=commit,
+            expires_at=datetime.now(timezone.utc) + expire_in,
+        )
+    return await jwt_crypto.run("sign", encode_jwt, jwt_payload, expire_in, jti)
 
 
 async def get_access_token(
@@ -104,6 +153,7 @@ async def get_refresh_token(
     session: AsyncSession,
     jwt_payload: dict[str, Any],
     request: Request | None = None,
+    jti: str | None = None,
 ) -> str:
     payload: dict[str, Any] = {
         "sub": jwt_payload["sub"],
@@ -114,44 +164,72 @@ async def get_refresh_token(
         token_payload=payload,
         expires=settings.auth_jwt.refresh_exp_minutes,
         request=request,
+        jti=jti,
+    )
+
+
+async def get_token_pair(
+    session: AsyncSession,
+    jwt_payload: dict[str, Any],
+    request: Request | None = None,
+) -> tuple[str, str]:
+    # JTI refresh-токена служит идентификатором семейства для выданных по нему access-токенов
+    family_jti = str(uuid.uuid4())
+    access_token = await create_jwt(
+        session=session,
+        token_type="access",  # noqa: S106
+        token_payload={**jwt_payload, "fid": family_jti},
+        expires=settings.auth_jwt.access_exp_minutes,
+        request=request,
+        commit=False,
+    )
+    refresh_token = await create_jwt(
+        session=session,
+        token_type="refresh",  # noqa: S106
+        token_payload={"sub": jwt_payload["sub"]},
+        expires=settings.auth_jwt.refresh_exp_minutes,
+        request=request,
+        jti=family_jti,
+        commit=False,
     )
+    # Обе записи уходят в БД одной транзакцией
+    await session.commit()
+    return access_token, refresh_token
 
 
-def get_current_token_payload(
+async def get_current_token_payload(
     token: Annotated[str, Depends(oauth2_scheme)],
 ) -> Any:
+    if (cached := VERIFIED_TOKENS_CACHE.get(token)) is not None:
+        return cached
     try:
-        payload = decode_jwt(token)
+        payload = await jwt_crypto.run("verify", decode_jwt, token)
     except InvalidTokenError as e:
         logger.error(str(e))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Token",
         )
+    VERIFIED_TOKENS_CACHE.set(token, payload)
     return payload
 
 
-async def get_user_id(
-    session: AsyncSession,
-    token_payload: dict[str, Any],
-    expect_token_type: TokenType,
-) -> int:
+def _check_token_payload(token_payload: Any) -> None:
     if not token_payload or not isinstance(token_payload, dict):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No token_payload provided or wrong token_payload type",
         )
-    if await is_token_revoked(session, token_payload.get("jti", "")):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Token revoked",
-        )
+
+
+def token_subject(token_payload: dict[str, Any], expect_token_type: TokenType) -> int:
     if (current_token_type := token_payload.get("type")) != expect_token_type:
         raise HTTPException(
             status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token type: {current_token_type!r}, expected {expect_token_type!r}",
         )
-    if not (user_id := token_payload.get("sub")):
+    user_id = token_payload.get("sub")
+    if not isinstance(user_id, str) or not (user_id.isascii() and user_id.isdigit()):
         raise HTTPException(
             status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
@@ -159,30 +237,92 @@ async def get_user_id(
     return int(user_id)
 
 
-def rate_limited(max_calls: int, time_frame: int) -> Any:
-    def decorator(func: Any) -> Any:
-        @wraps(func)
-        async def wrapper(
-            request: Request,
-            session: AsyncSession,
-            form_data: OAuth2PasswordRequestForm,
-        ) -> Any:
-            client_ip = request.client.host
-            now = datetime.now()
-            requests_data = RATE_LIMIT_DATA.get(client_ip, [])
-            requests_data = [t for t in requests_data if now - t < timedelta(seconds=time_frame)]
+async def resolve_principal(
+    request: Request,
+    session: AsyncSession,
+    token_payload: dict[str, Any],
+    expect_token_type: TokenType,
+    use_profile_claims: bool = False,
+) -> Principal:
+    # Один раз на запрос: повторные обращения берут готовый объект из request.state
+    principal: Principal | None = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    _check_token_payload(token_payload)
+    user_id = token_subject(token_payload, expect_token_type)
+    # Клеймы подписаны на время жизни токена, поэтому права по ним не проверяются:
+    # профиль из клеймов получает только /me, остальным нужен снимок или строка из БД
+    claims = profile_from_claims(token_payload, user_id) if use_profile_claims else None
+    principal = await get_principal(session, token_payload, user_id, claims)
+    if claims is None:
+        request.state.principal = principal
+    return principal
+
+
+async def get_current_principal(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    token_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
+) -> Principal:
+    return await resolve_principal(request, session, token_payload, "access")
+
+
+async def get_me_principal(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    token_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
+) -> Principal:
+    return await resolve_principal(request, session, token_payload, "access", use_profile_claims=True)
+
 
-            if len(requests_data) >= max_calls:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Too many requests. Try again later.",
-                )
+async def get_refresh_principal(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(db_helper.get_session)],
+    token_payload: Annotated[dict[str, Any], Depends(get_current_token_payload)],
+) -> Principal:
+    return await resolve_principal(request, session, token_payload, "refresh")
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+MePrincipal = Annotated[Principal, Depends(get_me_principal)]
+RefreshPrincipal = Annotated[Principal, Depends(get_refresh_principal)]
+
+
+def encode_cursor(user_id: int) -> str:
+    return base64.urlsafe_b64encode(str(user_id).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except ValueError:
+        decoded = ""
+    # Курсор больше 64-битного id не влезает в параметр запроса и ронял бы его с OverflowError
+    if not (decoded.isascii() and decoded.isdigit()) or int(decoded) > MAX_CURSOR_ID:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return int(decoded)
+
+
+def check_login_backoff(username: str, client_ip: str) -> None:
+    retry_after = max(
+        LOGIN_FAILURES.retry_after(f"user:{username}"),
+        LOGIN_FAILURES.retry_after(f"ip:{client_ip}"),
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
-            requests_data.append(now)
-            RATE_LIMIT_DATA[client_ip] = requests_data
 
-            return await func(request, session, form_data)
+def record_login_failure(username: str, client_ip: str) -> None:
+    LOGIN_FAILURES.record_failure(f"user:{username}", settings.login_backoff.user_free_attempts)
+    LOGIN_FAILURES.record_failure(f"ip:{client_ip}", settings.login_backoff.ip_free_attempts)
 
-        return wrapper
 
-    return decorator
+def reset_login_failures(username: str) -> None:
+    LOGIN_FAILURES.reset(f"user:{username}")
@@ -1,10 +1,14 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.api_v1.auth.utils import CurrentPrincipal
 from core.models.db_helper import db_helper
-from core.schemas.users import UserCreate, UserRead
+from core.schemas.users import UserCreate, UserProfile, UserRead
+from core.settings import settings
+from core.utils.export import MEDIA_TYPES, encode_rows, gzip_chunks
 from crud import users as crud_users
 
 router = APIRouter()
@@ -20,3 +24,25 @@ async def register_user(
 ) -> UserRead:
     result = await crud_users.create_user(session, user)
     return UserRead.model_validate(result)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    principal: CurrentPrincipal,
+    export_format: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+    gzip: bool = False,
+) -> StreamingResponse:
+    if not principal.is_superuser:
+        raise HTTPException(
+            status.HTTP_403_FORBIDDEN,
+            detail="Forbidden: superuser only",
+        )
+    fields = list(UserProfile.model_fields)
+    chunk_size = settings.export.chunk_size
+    rows = crud_users.stream_users(db_helper.session_factory, fields, chunk_size)
+    body = encode_rows(rows, fields, export_format, chunk_size)
+    headers = {"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=MEDIA_TYPES[export_format], headers=headers)
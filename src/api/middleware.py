@@ -0,0 +1,45 @@
+from starlette import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.settings import RateLimitRule, settings
+from core.utils.rate_limit import RateLimitStore
+
+RateLimitRules = dict[tuple[str, str], RateLimitRule]
+
+
+def default_rate_limit_rules() -> RateLimitRules:
+    v1_prefix = settings.api.prefix + settings.api.v1.prefix
+    return {
+        ("POST", f"{v1_prefix}/auth/login"): settings.rate_limit.login,
+        ("POST", f"{v1_prefix}/auth/refresh"): settings.rate_limit.refresh,
+        ("POST", f"{v1_prefix}/users/register"): settings.rate_limit.registration,
+    }
+
+
+class RateLimitMiddleware:
+    """
+    Лимит запросов на маршрут и IP клиента до роутинга FastAPI: отклонённый запрос
+    не разбирает тело формы и не берёт сессию из пула соединений.
+    """
+
+    def __init__(self, app: ASGIApp, store: RateLimitStore, rules: RateLimitRules) -> None:
+        self.app = app
+        self.store = store
+        self.rules = rules
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (rule := self.rules.get((scope["method"], scope["path"]))) is None:
+            await self.app(scope, receive, send)
+            return
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        result = await self.store.hit(f"{scope['path']}:{client_ip}", rule.max_calls, rule.time_frame)
+        if result.allowed:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"detail": "Too many requests. Try again later."},
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(result.retry_after)},
+        )
+        await response(scope, receive, send)
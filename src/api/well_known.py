@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response, status
+
+from core.settings import settings
+from core.utils.jwt_signer import jwt_signer
+
+# Набор ключей не меняется до перезапуска, поэтому тело и ETag считаются один раз
+JWKS_BODY = json.dumps(jwt_signer.jwks, separators=(",", ":")).encode()
+JWKS_ETAG = f'"{hashlib.sha256(JWKS_BODY).hexdigest()[:32]}"'
+
+router = APIRouter(
+    prefix="/.well-known",
+    tags=["Well-known"],
+)
+
+
+@router.get(
+    "/jwks.json",
+    response_class=Response,
+    responses={status.HTTP_200_OK: {"content": {"application/json": {}}}},
+)
+async def jwks(request: Request) -> Response:
+    headers = {
+        "ETag": JWKS_ETAG,
+        "Cache-Control": f"public, max-age={settings.auth_jwt.jwks_max_age_seconds}",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or JWKS_ETAG in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(JWKS_BODY, media_type="application/json", headers=headers)
@@ -41,6 +41,9 @@ class TokenBlacklist(IdIntPKMixin, Base):
     revoked_at: Mapped[Optional[datetime]] = mapped_column(
         nullable=True,
     )
+    expires_at: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True,
+    )
 
     __table_args__ = (
         Index(
@@ -56,4 +59,12 @@ class TokenBlacklist(IdIntPKMixin, Base):
             "ix_token_blacklist_created_at",
             "created_at",
         ),
+        Index(
+            "ix_token_blacklist_expires_at",
+            "expires_at",
+        ),
+        Index(
+            "ix_token_blacklist_revoked_at",
+            "revoked_at",
+        ),
     )
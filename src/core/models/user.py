@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Optional
+
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.models import Base
@@ -24,3 +27,8 @@ class User(IdIntPKMixin, Base):
     is_superuser: Mapped[bool] = mapped_column(
         default=False,
     )
+    # Токены, выданные раньше этого момента, недействительны ("выход со всех устройств")
+    tokens_valid_after: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True,
+        index=True,
+    )
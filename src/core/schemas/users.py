@@ -11,6 +11,29 @@ class UserRead(BaseModel):
     )
 
 
+class UsersPage(BaseModel):
+    items: list[UserRead]
+    # Непрозрачный курсор следующей страницы; None - страница последняя
+    next_cursor: str | None = None
+
+
+class UserProfile(BaseModel):
+    """Снимок пользователя для /me, /refresh и /all_users, хранится в кэше."""
+
+    id: int  # noqa: A003, VNE003
+    nickname: str
+    first_name: str | None
+    last_name: str | None
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        frozen=True,
+    )
+
+
 class UserCreate(BaseModel):
     nickname: str
     email: EmailStr
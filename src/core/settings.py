@@ -1,5 +1,6 @@
 import logging
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,11 +12,31 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 class AuthJWT(BaseModel):
     token_url: str = "/api/v1/auth/login"
-    algorithm: str = "RS256"
+    # RS256, ES256 (ключ на кривой P-256) или EdDSA (Ed25519)
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
     private_key: str = Path(BASE_DIR / "certs/jwt-private.pem").read_text()
     public_key: str = Path(BASE_DIR / "certs/jwt-public.pem").read_text()
+    # На время смены алгоритма или ключа токены, подписанные прежним ключом, ещё принимаются
+    previous_algorithm: Literal["RS256", "ES256", "EdDSA"] | None = None
+    previous_public_key_path: Path | None = None
+    # Сколько сторонние сервисы могут кэшировать /.well-known/jwks.json
+    jwks_max_age_seconds: int = 24 * 60 * 60
     access_exp_minutes: int = 15
     refresh_exp_minutes: int = 60 * 24 * 30
+    # False: в БД пишутся только refresh-токены, access-токены отзываются через семейство (fid)
+    persist_access_tokens: bool = True
+    # Профиль пользователя в клеймах access-токена: /me отвечает без БД, пока профиль не менялся
+    profile_claims: bool = False
+
+
+class JWTCryptoSettings(BaseModel):
+    # Подпись и проверка JWT в пуле потоков: cryptography отпускает GIL, и воркер занимает больше одного ядра
+    offload: bool = False
+    max_workers: int = 4
+    # В пул уходят операции, которые в среднем дороже offload_min_ms
+    offload_min_ms: float = 0.2
+    # Кэш уже проверенных токенов до их exp; 0 - проверять подпись на каждом запросе
+    verified_cache_max_entries: int = 10_000
 
 
 class APIV1Settings(BaseModel):
@@ -27,6 +48,17 @@ class APISettings(BaseModel):
     v1: APIV1Settings = APIV1Settings()
 
 
+class PaginationSettings(BaseModel):
+    # Размер страницы списков по умолчанию и его верхняя граница
+    default_limit: int = 100
+    max_limit: int = 1000
+
+
+class ExportSettings(BaseModel):
+    # Сколько строк читается с курсора и кодируется за раз
+    chunk_size: int = 1000
+
+
 class DBSettings(BaseModel):
     url: str
     echo: bool = False
@@ -35,6 +67,82 @@ class DBSettings(BaseModel):
     max_overflow: int = 10
 
 
+class PasswordHashSettings(BaseModel):
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int = 4
+    time_cost: int = 3
+    memory_cost: int = 64 * 1024
+    parallelism: int = 4
+    # Подбор параметров при старте: целевое время проверки и бюджет памяти (KiB)
+    calibrate: bool = False
+    target_ms: int = 50
+    max_memory_kib: int = 64 * 1024
+    max_parallelism: int = 4
+    # Admission control для проверки паролей: сверх очереди сразу отдаём 503
+    max_concurrent_verifications: int = 4
+    max_verification_queue: int = 32
+
+
+class LoginBackoffSettings(BaseModel):
+    user_free_attempts: int = 5
+    ip_free_attempts: int = 20
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 900.0
+    forget_after_seconds: float = 3600.0
+    max_entries: int = 100_000
+
+
+class TokenRecordSettings(BaseModel):
+    # Отложенная пакетная запись token_blacklists вместо commit на каждый выданный токен
+    write_behind: bool = False
+    batch_size: int = 200
+    flush_interval_seconds: float = 0.2
+    max_queue: int = 10_000
+    # Сколько выдача токена ждёт места в заполненной очереди, прежде чем писать запись напрямую
+    put_timeout_seconds: float = 1.0
+    # Удаление записей об истёкших токенах небольшими пачками
+    purge_interval_seconds: float = 300.0
+    purge_batch_size: int = 1000
+
+
+class RateLimitRule(BaseModel):
+    max_calls: int
+    time_frame: int
+
+
+class RateLimitSettings(BaseModel):
+    # shared: общие для всех воркеров хоста счётчики в SQLite по пути shared_state.path
+    backend: Literal["memory", "shared"] = "memory"
+    # Лимиты на IP клиента для маршрутов, проверяемых в middleware
+    login: RateLimitRule = RateLimitRule(max_calls=5, time_frame=60)
+    refresh: RateLimitRule = RateLimitRule(max_calls=30, time_frame=60)
+    registration: RateLimitRule = RateLimitRule(max_calls=10, time_frame=3600)
+
+
+class SharedStateSettings(BaseModel):
+    # Общий для воркеров одного хоста журнал событий (SQLite в режиме WAL)
+    path: str = str(BASE_DIR / "shared_state.sqlite3")
+    poll_interval_seconds: float = 0.5
+
+
+class RevocationSettings(BaseModel):
+    backend: Literal["memory", "shared"] = "memory"
+    # Bloom-фильтр отозванных JTI: отрицательный ответ не требует запроса в БД
+    filter_capacity: int = 1_000_000
+    filter_error_rate: float = 0.001
+    # С backend=memory другие воркеры видят отзыв не позже чем через filter_sync_seconds
+    filter_sync_seconds: float = 5.0
+    cache_max_entries: int = 100_000
+
+
+class UserCacheSettings(BaseModel):
+    # shared: сброс снимков рассылается другим воркерам через журнал shared_state
+    backend: Literal["memory", "shared"] = "memory"
+    # Снимки пользователей для get_principal; 0 - читать пользователя из БД на каждом запросе
+    max_entries: int = 10_000
+    ttl_seconds: float = 60.0
+
+
 class RunSettings(BaseModel):
     host: str = "127.0.0.1"
     port: int = 8000
@@ -43,7 +151,17 @@ class RunSettings(BaseModel):
 class AppSettings(BaseSettings):
     api: APISettings = APISettings()
     auth_jwt: AuthJWT = AuthJWT()
+    jwt_crypto: JWTCryptoSettings = JWTCryptoSettings()
     db: DBSettings
+    pagination: PaginationSettings = PaginationSettings()
+    export: ExportSettings = ExportSettings()
+    password_hash: PasswordHashSettings = PasswordHashSettings()
+    login_backoff: LoginBackoffSettings = LoginBackoffSettings()
+    revocation: RevocationSettings = RevocationSettings()
+    shared_state: SharedStateSettings = SharedStateSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    user_cache: UserCacheSettings = UserCacheSettings()
+    token_records: TokenRecordSettings = TokenRecordSettings()
     run: RunSettings = RunSettings()
 
     model_config = SettingsConfigDict(
@@ -0,0 +1,70 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class AdmissionRejectedError(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Admission queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """
+    Ограничивает число одновременно выполняемых задач и длину очереди ожидания.
+    Если очередь заполнена, запрос отклоняется сразу, а не копит работу для CPU.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.ewma_alpha = ewma_alpha
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.avg_service_time = 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def retry_after(self) -> int:
+        backlog = self.queue_depth + self.in_flight + 1
+        return max(1, math.ceil(backlog * self.avg_service_time / self.max_concurrency))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore.locked() and self.queue_depth >= self.max_queue:
+            self.rejected_total += 1
+            raise AdmissionRejectedError(self.retry_after())
+
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        self.admitted_total += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.avg_service_time += self.ewma_alpha * (elapsed - self.avg_service_time)
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "avg_service_time": self.avg_service_time,
+        }
@@ -0,0 +1,67 @@
+import math
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class _FailureRecord(NamedTuple):
+    failures: int
+    blocked_until: float
+    last_failure: float
+
+
+class FailureBackoff:
+    """
+    Счётчик неудачных попыток с экспоненциальной задержкой.
+    Записи упорядочены по времени последней неудачи, поэтому устаревшие
+    вычищаются с начала словаря за O(1) на операцию.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = 1.0,
+        max_delay: float = 900.0,
+        forget_after: float = 3600.0,
+        max_entries: int = 100_000,
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.forget_after = max(forget_after, max_delay)
+        self.max_entries = max_entries
+        self._records: OrderedDict[str, _FailureRecord] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def retry_after(self, key: str) -> int:
+        record = self._records.get(key)
+        if record is None:
+            return 0
+        remaining = record.blocked_until - time.monotonic()
+        return math.ceil(remaining) if remaining > 0 else 0
+
+    def record_failure(self, key: str, free_attempts: int) -> None:
+        now = time.monotonic()
+        self._evict_stale(now)
+        record = self._records.pop(key, None)
+        failures = record.failures + 1 if record else 1
+        blocked_until = now
+        if failures > free_attempts:
+            delay = self.base_delay * 2 ** min(failures - free_attempts - 1, 32)
+            blocked_until = now + min(delay, self.max_delay)
+        self._records[key] = _FailureRecord(failures, blocked_until, now)
+        if len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    def reset(self, key: str) -> None:
+        self._records.pop(key, None)
+
+    def _evict_stale(self, now: float) -> None:
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if now - record.last_failure < self.forget_after:
+                break
+            del self._records[key]
@@ -0,0 +1,52 @@
+import hashlib
+import math
+from typing import Iterator
+
+
+class BloomFilter:
+    """
+    Вероятностное множество строк: отрицательный ответ точен,
+    положительный ошибается с вероятностью около error_rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size_bits / self.capacity * math.log(2)))
+        self.items = 0
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size_bits
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, str):
+            return False
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.items
+
+    def estimated_error_rate(self) -> float:
+        return float((1 - math.exp(-self.hash_count * self.items / self.size_bits)) ** self.hash_count)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "capacity": self.capacity,
+            "items": self.items,
+            "size_bits": self.size_bits,
+            "memory_bytes": len(self._bits),
+            "hash_count": self.hash_count,
+            "error_rate": self.error_rate,
+            "estimated_error_rate": self.estimated_error_rate(),
+        }
@@ -0,0 +1,105 @@
+import heapq
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class ExpiringLRUCache(Generic[KeyT, ValueT]):
+    """
+    LRU-кэш, в котором у каждой записи свой момент истечения (unix time).
+    Истёкшие записи вытесняются по куче сроков, при переполнении - самые старые по доступу.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data: OrderedDict[KeyT, tuple[ValueT, float]] = OrderedDict()
+        self._expiry_heap: list[tuple[float, int, KeyT]] = []
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore[arg-type]
+
+    def get(self, key: KeyT) -> ValueT | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KeyT, value: ValueT, expires_at: float) -> None:  # noqa: A003
+        now = self.clock()
+        self.evict_expired(now)
+        if expires_at <= now:
+            self._data.pop(key, None)
+            return
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        self._counter += 1
+        heapq.heappush(self._expiry_heap, (expires_at, self._counter, key))
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+        if len(self._expiry_heap) > 2 * self.maxsize:
+            self._compact_heap()
+
+    def items(self) -> list[tuple[KeyT, ValueT]]:
+        now = self.clock()
+        return [(key, value) for key, (value, expires_at) in self._data.items() if expires_at > now]
+
+    def discard(self, key: KeyT) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._expiry_heap.clear()
+
+    def evict_expired(self, now: float | None = None) -> int:
+        now = self.clock() if now is None else now
+        evicted = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry_heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+                evicted += 1
+        self.expirations += evicted
+        return evicted
+
+    def _compact_heap(self) -> None:
+        self._expiry_heap = [item for item in self._expiry_heap if self._data.get(item[2], (None, None))[1] == item[0]]
+        heapq.heapify(self._expiry_heap)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
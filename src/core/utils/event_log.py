@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EventListener = Callable[[str, float], None]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_events_expires_at ON events (expires_at);
+"""
+
+
+class SharedEventLog:
+    """
+    Общий для воркеров одного хоста журнал событий в SQLite (WAL).
+    Каждый воркер дописывает свои события и раз в poll_interval читает чужие,
+    поэтому задержка распространения ограничена интервалом опроса.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        poll_interval: float = 0.5,
+        purge_every: int = 120,
+    ) -> None:
+        self.path = path
+        self.poll_interval = poll_interval
+        self.purge_every = purge_every
+        self.origin = uuid.uuid4().hex
+        self.last_seq = 0
+        self.published_total = 0
+        self.received_total = 0
+        self._listeners: dict[str, list[EventListener]] = defaultdict(list)
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._poller: asyncio.Task[None] | None = None
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._listeners)
+
+    def subscribe(self, channel: str, listener: EventListener) -> None:
+        self._listeners[channel].append(listener)
+
+    async def start(self) -> None:
+        if self._poller is not None:
+            return
+        await asyncio.to_thread(self._open)
+        # При старте проигрываем все ещё актуальные события, включая записанные до перезапуска
+        await self.poll()
+        self._poller = asyncio.create_task(self._poll_forever())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        if self._connection is not None:
+            with self._lock:
+                self._connection.close()
+                self._connection = None
+
+    async def publish(self, channel: str, key: str, value: float, expires_at: float) -> None:
+        if self._connection is None:
+            return
+        await asyncio.to_thread(self._insert, self._connection, channel, key, value, expires_at)
+        self.published_total += 1
+
+    async def poll(self) -> int:
+        if self._connection is None:
+            return 0
+        rows = await asyncio.to_thread(self._fetch_new, self._connection)
+        for channel, key, value in rows:
+            for listener in self._listeners.get(channel, ()):
+                listener(key, value)
+        self.received_total += len(rows)
+        return len(rows)
+
+    def _open(self) -> None:
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        self._connection = connection
+
+    def _insert(self, connection: sqlite3.Connection, channel: str, key: str, value: float, expires_at: float) -> None:
+        with self._lock:
+            connection.execute(
+                "INSERT INTO events (origin, channel, key, value, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self.origin, channel, key, value, expires_at),
+            )
+
+    def _fetch_new(self, connection: sqlite3.Connection) -> list[tuple[str, str, float]]:
+        with self._lock:
+            rows = connection.execute(
+                "SELECT seq, origin, channel, key, value FROM events WHERE seq > ? AND expires_at > ? ORDER BY seq",
+                (self.last_seq, time.time()),
+            ).fetchall()
+        if rows:
+            self.last_seq = rows[-1][0]
+        return [(channel, key, value) for _, origin, channel, key, value in rows if origin != self.origin]
+
+    def _purge_expired(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            connection.execute("DELETE FROM events WHERE expires_at <= ?", (time.time(),))
+
+    async def _poll_forever(self) -> None:
+        polls = 0
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+                polls += 1
+                if polls % self.purge_every == 0 and self._connection is not None:
+                    await asyncio.to_thread(self._purge_expired, self._connection)
+            except Exception as exc:
+                logger.error(f"Shared event log poll failed: {exc}")
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "last_seq": self.last_seq,
+            "published_total": self.published_total,
+            "received_total": self.received_total,
+        }
+
+
+shared_event_log = SharedEventLog(
+    path=settings.shared_state.path,
+    poll_interval=settings.shared_state.poll_interval_seconds,
+)
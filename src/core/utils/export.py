@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Literal
+
+ExportFormat = Literal["ndjson", "csv"]
+Row = dict[str, Any]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _encode_ndjson(rows: list[Row], fields: list[str], header: bool) -> str:
+    return "".join(json.dumps({field: row[field] for field in fields}, default=str) + "\n" for row in rows)
+
+
+# Табличные редакторы исполняют ячейку, начинающуюся с этих символов, как формулу
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _escape_csv_value(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _encode_csv(rows: list[Row], fields: list[str], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows({field: _escape_csv_value(value) for field, value in row.items()} for row in rows)
+    return buffer.getvalue()
+
+
+ENCODERS = {
+    "ndjson": _encode_ndjson,
+    "csv": _encode_csv,
+}
+
+
+async def encode_rows(
+    rows: AsyncIterator[Row],
+    fields: list[str],
+    export_format: ExportFormat,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """Кодирует строки пачками по chunk_size: в памяти не больше одной пачки."""
+    encode = ENCODERS[export_format]
+    header = True
+    chunk: list[Row] = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield encode(chunk, fields, header).encode()
+            header = False
+            chunk = []
+    if chunk or header:
+        yield encode(chunk, fields, header).encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        # Сброс после каждой пачки: клиент получает данные сразу, а не по заполнении буфера zlib
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal
+
+from argon2 import DEFAULT_HASH_LENGTH, DEFAULT_RANDOM_SALT_LENGTH, PasswordHasher, extract_parameters
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+from argon2.low_level import ARGON2_VERSION
+
+from core.settings import settings
+from core.utils.admission import AdmissionLimiter
+
+logger = logging.getLogger(__name__)
+
+ExecutorMode = Literal[
+    "thread",
+    "process",
+]
+
+MIN_MEMORY_COST_KIB = 8 * 1024
+MAX_TIME_COST = 10
+
+
+def _hash_password(hasher: PasswordHasher, password: str) -> str:
+    return hasher.hash(password)
+
+
+def _verify_password(hasher: PasswordHasher, hashed_password: str | bytes, password: str | bytes) -> bool:
+    try:
+        hasher.verify(hashed_password, password)
+    except (
+        InvalidHashError,
+        VerifyMismatchError,
+        VerificationError,
+    ):
+        return False
+    return True
+
+
+def _measure_verify_ms(hasher: PasswordHasher, rounds: int = 3) -> float:
+    hashed_password = hasher.hash("calibration")
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.verify(hashed_password, "calibration")
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[rounds // 2] * 1000
+
+
+def _build_hasher(time_cost: int, memory_cost: int, parallelism: int) -> PasswordHasher:
+    return PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=DEFAULT_HASH_LENGTH,
+        salt_len=DEFAULT_RANDOM_SALT_LENGTH,
+    )
+
+
+def calibrate_hasher(
+    target_ms: float,
+    max_memory_kib: int,
+    max_parallelism: int,
+) -> PasswordHasher:
+    """
+    Подбирает параметры Argon2 под целевое время проверки пароля:
+    память берётся по максимуму бюджета и уменьшается, только если даже
+    time_cost=1 не укладывается в target_ms, затем наращивается time_cost.
+    """
+    parallelism = max(1, min(max_parallelism, os.cpu_count() or 1))
+    memory_cost = max(max_memory_kib, 8 * parallelism)
+    min_memory_cost = min(memory_cost, MIN_MEMORY_COST_KIB)
+
+    elapsed_ms = _measure_verify_ms(_build_hasher(1, memory_cost, parallelism))
+    while elapsed_ms > target_ms and memory_cost > min_memory_cost:
+        memory_cost = max(min_memory_cost, memory_cost // 2)
+        elapsed_ms = _measure_verify_ms(_build_hasher(1, memory_cost, parallelism))
+
+    time_cost = max(1, min(MAX_TIME_COST, int(target_ms // max(elapsed_ms, 0.001))))
+    hasher = _build_hasher(time_cost, memory_cost, parallelism)
+    while time_cost > 1 and _measure_verify_ms(hasher) > target_ms * 1.25:
+        time_cost -= 1
+        hasher = _build_hasher(time_cost, memory_cost, parallelism)
+    return hasher
+
+
+# Argon2 занимает десятки миллисекунд CPU, поэтому выносим его из event loop
+class PasswordHashExecutor:
+    def __init__(
+        self,
+        mode: ExecutorMode = "thread",
+        max_workers: int = 4,
+        hasher: PasswordHasher | None = None,
+    ) -> None:
+        self.mode = mode
+        self.max_workers = max_workers
+        self.hasher = hasher or PasswordHasher()
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="argon2",
+                )
+            logger.info(f"Password hashing executor started: {self.mode}, {self.max_workers} workers")
+        return self._executor
+
+    async def hash(self, password: str) -> str:  # noqa: A003
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _hash_password, self.hasher, password)
+
+    async def verify(self, hashed_password: str | bytes, password: str | bytes) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _verify_password, self.hasher, hashed_password, password)
+
+    def check_needs_rehash(self, hashed_password: str | bytes) -> bool:
+        """
+        Перехешировать нужно только хеш слабее текущих параметров. Калибровка в разных воркерах
+        даёт немного разный time_cost, и при точном сравнении хеш скакал бы между наборами.
+        """
+        if isinstance(hashed_password, bytes):
+            hashed_password = hashed_password.decode()
+        try:
+            stored = extract_parameters(hashed_password)
+        except InvalidHashError:
+            return True
+        current = self.hasher
+        if stored.type != current.type or stored.version < ARGON2_VERSION:
+            return True
+        if stored.hash_len < current.hash_len or stored.salt_len < current.salt_len:
+            return True
+        return stored.time_cost * stored.memory_cost < current.time_cost * current.memory_cost
+
+    async def calibrate(
+        self,
+        target_ms: float,
+        max_memory_kib: int,
+        max_parallelism: int,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        self.hasher = await loop.run_in_executor(
+            None,
+            calibrate_hasher,
+            target_ms,
+            max_memory_kib,
+            max_parallelism,
+        )
+        logger.info(
+            f"Argon2 calibrated to {target_ms} ms: time_cost={self.hasher.time_cost}, "
+            f"memory_cost={self.hasher.memory_cost} KiB, parallelism={self.hasher.parallelism}",
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHashExecutor(
+    mode=settings.password_hash.executor,
+    max_workers=settings.password_hash.max_workers,
+    hasher=_build_hasher(
+        time_cost=settings.password_hash.time_cost,
+        memory_cost=settings.password_hash.memory_cost,
+        parallelism=settings.password_hash.parallelism,
+    ),
+)
+
+verification_limiter = AdmissionLimiter(
+    max_concurrency=settings.password_hash.max_concurrent_verifications,
+    max_queue=settings.password_hash.max_verification_queue,
+)
@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, NamedTuple, Sequence
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt import (
+    DecodeError,
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAlgorithmError,
+    InvalidKeyError,
+    InvalidSignatureError,
+    InvalidTokenError,
+)
+from jwt.algorithms import Algorithm
+
+from core.settings import settings
+from core.utils.offload import AdaptiveOffloader
+
+LoadedKey = tuple[Algorithm, Any]
+
+TIME_CLAIMS = ("exp", "iat", "nbf")
+
+# Какие типы ключей допустимы для каждого поддерживаемого алгоритма
+KEY_TYPES: dict[str, tuple[type, ...]] = {
+    "RS256": (rsa.RSAPrivateKey, rsa.RSAPublicKey),
+    "ES256": (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+    "EdDSA": (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+}
+
+# Обязательные поля JWK по типу ключа, из которых считается отпечаток (RFC 7638)
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+class VerificationKey(NamedTuple):
+    kid: str
+    algorithm: str
+    jwt_algorithm: Algorithm
+    key: Any
+    jwk: dict[str, str]
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+    except ValueError as exc:
+        raise DecodeError("Invalid token padding") from exc
+
+
+def _json_segment(data: bytes) -> dict[str, Any]:
+    try:
+        value = json.loads(_b64decode(data))
+    except ValueError as exc:
+        raise DecodeError("Invalid token segment") from exc
+    if not isinstance(value, dict):
+        raise DecodeError("Invalid token segment")
+    return value
+
+
+def load_key(algorithm: str, pem: str) -> LoadedKey:
+    if algorithm not in KEY_TYPES:
+        raise InvalidAlgorithmError(f"Unsupported JWT algorithm: {algorithm!r}")
+    jwt_algorithm = jwt.get_algorithm_by_name(algorithm)
+    key = jwt_algorithm.prepare_key(pem)
+    if not isinstance(key, KEY_TYPES[algorithm]):
+        raise InvalidKeyError(f"{algorithm} key expected, got {type(key).__name__}")
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name != "secp256r1":
+        raise InvalidKeyError(f"ES256 requires a P-256 key, got {key.curve.name}")
+    return jwt_algorithm, key
+
+
+def jwk_thumbprint(jwk: dict[str, str]) -> str:
+    members = {member: jwk[member] for member in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    return _b64encode(hashlib.sha256(canonical).digest()).decode()
+
+
+def load_verification_key(algorithm: str, pem: str) -> VerificationKey:
+    jwt_algorithm, key = load_key(algorithm, pem)
+    public_key = key.public_key() if hasattr(key, "private_bytes") else key
+    jwk = jwt_algorithm.to_jwk(public_key, as_dict=True)
+    kid = jwk_thumbprint(jwk)
+    members = {member: jwk[member] for member in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    return VerificationKey(
+        kid=kid,
+        algorithm=algorithm,
+        jwt_algorithm=jwt_algorithm,
+        key=public_key,
+        jwk={**members, "kid": kid, "alg": algorithm, "use": "sig"},
+    )
+
+
+class JWTSigner:
+    """
+    Подписывает и проверяет JWT ключами, разобранными один раз при создании.
+    PyJWT на каждом вызове заново парсит PEM; здесь ключи уже загружены в объекты cryptography,
+    а сегмент заголовка закодирован заранее.
+    previous_keys - пары (алгоритм, публичный PEM), которыми ещё проверяются старые токены.
+    Токены несут kid - отпечаток ключа (RFC 7638), по нему ключ для проверки берётся из кольца keys.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        public_key: str,
+        algorithm: str,
+        previous_keys: Sequence[tuple[str, str]] = (),
+    ) -> None:
+        self.algorithm = algorithm
+        self._algorithm, self._private_key = load_key(algorithm, private_key)
+        self.keys: dict[str, VerificationKey] = {}
+        # Токены, выпущенные до появления kid, проверяются перебором ключей своего алгоритма
+        self._keys_by_algorithm: dict[str, list[VerificationKey]] = {}
+        current_key = load_verification_key(algorithm, public_key)
+        if current_key.kid != load_verification_key(algorithm, private_key).kid:
+            raise InvalidKeyError("Public key does not match the private key")
+        self.kid = current_key.kid
+        previous = [
+            load_verification_key(verify_algorithm, verify_pem) for verify_algorithm, verify_pem in previous_keys
+        ]
+        for verification_key in (current_key, *previous):
+            self.keys.setdefault(verification_key.kid, verification_key)
+            self._keys_by_algorithm.setdefault(verification_key.algorithm, []).append(verification_key)
+        self.jwks = {"keys": [verification_key.jwk for verification_key in self.keys.values()]}
+        header = {"alg": algorithm, "kid": self.kid, "typ": "JWT"}
+        self._header_segment = _b64encode(json.dumps(header, separators=(",", ":")).encode())
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        claims = payload.copy()
+        for claim in TIME_CLAIMS:
+            if isinstance(value := claims.get(claim), datetime):
+                claims[claim] = timegm(value.utctimetuple())
+        payload_segment = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self._header_segment + b"." + payload_segment
+        signature = self._algorithm.sign(signing_input, self._private_key)
+        return (signing_input + b"." + _b64encode(signature)).decode()
+
+    def decode(self, token: str | bytes) -> dict[str, Any]:
+        raw = token.encode() if isinstance(token, str) else token
+        try:
+            signing_input, signature_segment = raw.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+        except ValueError as exc:
+            raise DecodeError("Not enough segments") from exc
+        header = _json_segment(header_segment)
+        candidates = self._candidate_keys(header)
+        signature = _b64decode(signature_segment)
+        if not any(key.jwt_algorithm.verify(signing_input, key.key, signature) for key in candidates):
+            raise InvalidSignatureError("Signature verification failed")
+        payload = _json_segment(payload_segment)
+        self._validate_claims(payload)
+        return payload
+
+    def _candidate_keys(self, header: dict[str, Any]) -> list[VerificationKey]:
+        # Заголовок выбирает только среди заранее загруженных ключей, алгоритм обязан совпасть с ключом
+        if not isinstance(algorithm := header.get("alg"), str):
+            raise InvalidAlgorithmError("The specified alg value is not allowed")
+        if (kid := header.get("kid")) is None:
+            candidates = self._keys_by_algorithm.get(algorithm, [])
+        else:
+            verification_key = self._key_by_id(kid)
+            candidates = [verification_key] if verification_key.algorithm == algorithm else []
+        if not candidates:
+            raise InvalidAlgorithmError("The specified alg value is not allowed")
+        return candidates
+
+    def _key_by_id(self, kid: Any) -> VerificationKey:
+        # kid тоже из недоверенного заголовка: не строка - значит, такого ключа нет
+        if not isinstance(kid, str) or (verification_key := self.keys.get(kid)) is None:
+            raise InvalidTokenError("Unknown signing key")
+        return verification_key
+
+    @staticmethod
+    def _validate_claims(payload: dict[str, Any]) -> None:
+        now = time.time()
+        if any(not isinstance(payload[claim], (int, float)) for claim in TIME_CLAIMS if claim in payload):
+            raise DecodeError("Time claims must be numbers")
+        if "exp" in payload and payload["exp"] <= now:
+            raise ExpiredSignatureError("Signature has expired")
+        if "nbf" in payload and payload["nbf"] > now:
+            raise ImmatureSignatureError("The token is not yet valid (nbf)")
+
+
+def _previous_keys() -> list[tuple[str, str]]:
+    previous_path = settings.auth_jwt.previous_public_key_path
+    if previous_path is None:
+        return []
+    return [(settings.auth_jwt.previous_algorithm or settings.auth_jwt.algorithm, previous_path.read_text())]
+
+
+jwt_signer = JWTSigner(
+    private_key=settings.auth_jwt.private_key,
+    public_key=settings.auth_jwt.public_key,
+    algorithm=settings.auth_jwt.algorithm,
+    previous_keys=_previous_keys(),
+)
+
+jwt_crypto = AdaptiveOffloader(
+    enabled=settings.jwt_crypto.offload,
+    max_workers=settings.jwt_crypto.max_workers,
+    min_cost_ms=settings.jwt_crypto.offload_min_ms,
+)
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+ResultT = TypeVar("ResultT")
+
+
+def _timed(func: Callable[..., ResultT], *args: Any) -> tuple[ResultT, float]:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+class AdaptiveOffloader:
+    """
+    Выполняет синхронную CPU-работу в пуле потоков, только когда это окупает переход в поток.
+    В пул уходят операции, чья средняя стоимость не меньше min_cost_ms; остальные выполняются
+    сразу в event loop. Число операций в работе на решение не влияет: операции в event loop
+    не пересекаются друг с другом, и поток для дешёвой операции не окупается и под нагрузкой.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_workers: int,
+        min_cost_ms: float,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self.enabled = enabled
+        self.max_workers = max_workers
+        self.min_cost_ms = min_cost_ms
+        self.ewma_alpha = ewma_alpha
+        self.in_flight = 0
+        self.inline_total = 0
+        self.offloaded_total = 0
+        self.costs_ms: dict[str, float] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="offload")
+        return self._executor
+
+    def should_offload(self, operation: str) -> bool:
+        if not self.enabled:
+            return False
+        return self.costs_ms.get(operation, 0.0) >= self.min_cost_ms
+
+    async def run(self, operation: str, func: Callable[..., ResultT], *args: Any) -> ResultT:
+        if not self.should_offload(operation):
+            result, elapsed_ms = _timed(func, *args)
+            self.inline_total += 1
+        else:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                result, elapsed_ms = await loop.run_in_executor(self.executor, _timed, func, *args)
+            finally:
+                self.in_flight -= 1
+            self.offloaded_total += 1
+        previous = self.costs_ms.get(operation, elapsed_ms)
+        self.costs_ms[operation] = previous + self.ewma_alpha * (elapsed_ms - previous)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "inline_total": self.inline_total,
+            "offloaded_total": self.offloaded_total,
+            **{f"{operation}_cost_ms": cost for operation, cost in self.costs_ms.items()},
+        }
@@ -0,0 +1,250 @@
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Literal, NamedTuple
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: int
+
+
+ALLOWED = RateLimitResult(True, 0)
+
+# Счётчик упаковывается в одно int: номер окна, счётчики предыдущего и текущего окна
+COUNT_BITS = 16
+COUNT_MASK = (1 << COUNT_BITS) - 1
+
+
+def _pack(window_index: int, previous: int, current: int) -> int:
+    return window_index << 2 * COUNT_BITS | min(previous, COUNT_MASK) << COUNT_BITS | min(current, COUNT_MASK)
+
+
+def _unpack(counter: int) -> tuple[int, int, int]:
+    return counter >> 2 * COUNT_BITS, counter >> COUNT_BITS & COUNT_MASK, counter & COUNT_MASK
+
+
+def sliding_window_retry_after(limit: int, previous: int, current: int, elapsed: float, window: float) -> float:
+    # Через сколько секунд оценка previous * (1 - доля окна) + current опустится до limit - 1
+    if current < limit and previous:
+        fraction = 1 - (limit - 1 - current) / previous
+        return max(0.0, (fraction - elapsed) * window)
+    next_fraction = max(0.0, 1 - (limit - 1) / current) if current else 0.0
+    return (1 - elapsed + next_fraction) * window
+
+
+def sliding_window_check(
+    counter: tuple[int, int, int] | None,
+    now: float,
+    limit: int,
+    window: float,
+) -> tuple[RateLimitResult, tuple[int, int, int] | None]:
+    """Решение по запросу и новое состояние счётчика (None - состояние не меняется)."""
+    window_index = int(now // window)
+    elapsed = (now % window) / window
+    previous, current = 0, 0
+    if counter is not None:
+        counter_index, counter_previous, counter_current = counter
+        if counter_index == window_index:
+            previous, current = counter_previous, counter_current
+        elif counter_index == window_index - 1:
+            previous = counter_current
+    if previous * (1 - elapsed) + current + 1 > limit:
+        retry_after = sliding_window_retry_after(limit, previous, current, elapsed, window)
+        return RateLimitResult(False, max(1, math.ceil(retry_after))), None
+    return ALLOWED, (window_index, previous, current + 1)
+
+
+class RateLimitStore(ABC):
+    """Хранилище счётчиков скользящего окна: hit() атомарно проверяет лимит и учитывает запрос."""
+
+    def __init__(self) -> None:
+        self.allowed_total = 0
+        self.rejected_total = 0
+        self.evicted_total = 0
+
+    @abstractmethod
+    def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        raise NotImplementedError
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        return self.check(key, limit, window)
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+    def _count(self, result: RateLimitResult) -> RateLimitResult:
+        if result.allowed:
+            self.allowed_total += 1
+        else:
+            self.rejected_total += 1
+        return result
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "allowed_total": self.allowed_total,
+            "rejected_total": self.rejected_total,
+            "evicted_total": self.evicted_total,
+        }
+
+
+class SlidingWindowRateLimiter(RateLimitStore):
+    """
+    Лимит запросов скользящим окном по двум счётчикам: текущего и предыдущего окна.
+    На ключ хранится одно int, время берётся из монотонных часов, а ключи, по которым
+    не было запросов два окна, вытесняются понемногу при каждом обращении.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        evict_batch: int = 64,
+    ) -> None:
+        super().__init__()
+        self.clock = clock
+        self.evict_batch = evict_batch
+        # Отдельная таблица на каждую длину окна, ключи в порядке последнего разрешённого запроса
+        self._tables: dict[float, OrderedDict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables.values())
+
+    def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = self.clock()
+        if (table := self._tables.get(window)) is None:
+            table = self._tables[window] = OrderedDict()
+        self._evict_table(table, int(now // window), self.evict_batch)
+        counter = table.get(key)
+        result, updated = sliding_window_check(_unpack(counter) if counter is not None else None, now, limit, window)
+        if updated is not None:
+            table[key] = _pack(*updated)
+            table.move_to_end(key)
+        return self._count(result)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        now = self.clock() if now is None else now
+        return sum(self._evict_table(table, int(now // window)) for window, table in self._tables.items())
+
+    def _evict_table(self, table: OrderedDict[str, int], window_index: int, limit: int | None = None) -> int:
+        evicted = 0
+        while table and (limit is None or evicted < limit):
+            key, counter = next(iter(table.items()))
+            # Счётчик старше предыдущего окна уже ни на что не влияет
+            if counter >> 2 * COUNT_BITS >= window_index - 1:
+                break
+            del table[key]
+            evicted += 1
+        self.evicted_total += evicted
+        return evicted
+
+    def clear(self) -> None:
+        self._tables.clear()
+
+    def stats(self) -> dict[str, float]:
+        return {"keys": len(self), **super().stats()}
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT NOT NULL,
+    window REAL NOT NULL,
+    window_index INTEGER NOT NULL,
+    previous INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    idle_at REAL NOT NULL,
+    PRIMARY KEY (key, window)
+);
+CREATE INDEX IF NOT EXISTS ix_rate_limits_idle_at ON rate_limits (idle_at);
+"""
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Общие для воркеров одного хоста счётчики в SQLite (WAL). Проверка и учёт запроса
+    выполняются в одной транзакции BEGIN IMMEDIATE, поэтому лимит не превышается при гонке воркеров.
+    Часы - time.time(): монотонные часы у каждого процесса свои.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        clock: Callable[[], float] = time.time,
+        purge_every: int = 1000,
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.clock = clock
+        self.purge_every = purge_every
+        self._checks = 0
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        return await asyncio.to_thread(self.check, key, limit, window)
+
+    def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = self.clock()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT window_index, previous, current FROM rate_limits WHERE key = ? AND window = ?",
+                    (key, window),
+                ).fetchone()
+                result, updated = sliding_window_check(row, now, limit, window)
+                if updated is not None:
+                    connection.execute(
+                        "INSERT INTO rate_limits (key, window, window_index, previous, current, idle_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (key, window) DO UPDATE SET "
+                        "window_index = excluded.window_index, previous = excluded.previous, "
+                        "current = excluded.current, idle_at = excluded.idle_at",
+                        (key, window, *updated, (updated[0] + 2) * window),
+                    )
+                self._checks += 1
+                if self._checks % self.purge_every == 0:
+                    self.evicted_total += connection.execute(
+                        "DELETE FROM rate_limits WHERE idle_at <= ?",
+                        (now,),
+                    ).rowcount
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return self._count(result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM rate_limits")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+
+def create_rate_limit_store(
+    backend: Literal["memory", "shared"],
+    path: str,
+) -> RateLimitStore:
+    if backend == "shared":
+        return SQLiteRateLimitStore(path)
+    return SlidingWindowRateLimiter()
@@ -0,0 +1,126 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Literal
+
+from core.utils.cache import ExpiringLRUCache
+from core.utils.event_log import SharedEventLog
+
+RevocationListener = Callable[[str], None]
+
+REVOCATION_CHANNEL = "revocation"
+USER_CUTOFF_CHANNEL = "user_cutoff"
+
+
+class RevocationStore(ABC):
+    """
+    Локальный кэш отозванных JTI и способ донести отзыв до других воркеров.
+    Для "выхода со всех устройств" хранит по пользователю момент, раньше которого
+    выданные токены недействительны: запись живёт, пока могут жить такие токены (cutoff_ttl).
+    """
+
+    def __init__(self, cache: ExpiringLRUCache[str, bool], cutoff_ttl: float) -> None:
+        self.cache = cache
+        self.cutoff_ttl = cutoff_ttl
+        self.user_cutoffs: dict[int, float] = {}
+        self.latest_user_cutoff: float | None = None
+        self._listeners: list[RevocationListener] = []
+
+    def subscribe(self, listener: RevocationListener) -> None:
+        self._listeners.append(listener)
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self.cache
+
+    def remember(self, jti: str, expires_at: float) -> None:
+        self.cache.set(jti, True, expires_at)
+        for listener in self._listeners:
+            listener(jti)
+
+    def issued_before_cutoff(self, user_id: int, issued_at: float) -> bool:
+        cutoff = self.user_cutoffs.get(user_id)
+        # iat хранится в целых секундах, поэтому токены той же секунды, что и отзыв,
+        # не отсекаются - иначе пострадал бы вход сразу после "выхода отовсюду"
+        return cutoff is not None and issued_at < int(cutoff)
+
+    def remember_user_cutoff(self, user_id: int, cutoff: float) -> None:
+        if cutoff + self.cutoff_ttl <= time.time():
+            return
+        self.user_cutoffs[user_id] = max(cutoff, self.user_cutoffs.get(user_id, cutoff))
+        if self.latest_user_cutoff is None or cutoff > self.latest_user_cutoff:
+            self.latest_user_cutoff = cutoff
+
+    def purge_user_cutoffs(self) -> int:
+        oldest = time.time() - self.cutoff_ttl
+        expired = [user_id for user_id, cutoff in self.user_cutoffs.items() if cutoff <= oldest]
+        for user_id in expired:
+            del self.user_cutoffs[user_id]
+        return len(expired)
+
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_user(self, user_id: int, cutoff: float) -> None:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+    def stats(self) -> dict[str, float]:
+        return {**self.cache.stats(), "user_cutoffs": len(self.user_cutoffs)}
+
+
+class InMemoryRevocationStore(RevocationStore):
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self.remember(jti, expires_at)
+
+    async def revoke_user(self, user_id: int, cutoff: float) -> None:
+        self.remember_user_cutoff(user_id, cutoff)
+
+
+class SharedRevocationStore(RevocationStore):
+    def __init__(
+        self,
+        cache: ExpiringLRUCache[str, bool],
+        cutoff_ttl: float,
+        event_log: SharedEventLog,
+    ) -> None:
+        super().__init__(cache, cutoff_ttl)
+        self.event_log = event_log
+        event_log.subscribe(REVOCATION_CHANNEL, self.remember)
+        event_log.subscribe(USER_CUTOFF_CHANNEL, self._remember_published_cutoff)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self.remember(jti, expires_at)
+        await self.event_log.publish(REVOCATION_CHANNEL, jti, expires_at, expires_at)
+
+    async def revoke_user(self, user_id: int, cutoff: float) -> None:
+        self.remember_user_cutoff(user_id, cutoff)
+        await self.event_log.publish(USER_CUTOFF_CHANNEL, str(user_id), cutoff, cutoff + self.cutoff_ttl)
+
+    def _remember_published_cutoff(self, user_id: str, cutoff: float) -> None:
+        self.remember_user_cutoff(int(user_id), cutoff)
+
+    async def start(self) -> None:
+        await self.event_log.start()
+
+    async def stop(self) -> None:
+        await self.event_log.stop()
+
+    def stats(self) -> dict[str, float]:
+        return {**super().stats(), **self.event_log.stats()}
+
+
+def create_revocation_store(
+    backend: Literal["memory", "shared"],
+    cache: ExpiringLRUCache[str, bool],
+    cutoff_ttl: float,
+    event_log: SharedEventLog,
+) -> RevocationStore:
+    if backend == "shared":
+        return SharedRevocationStore(cache, cutoff_ttl, event_log)
+    return InMemoryRevocationStore(cache, cutoff_ttl)
@@ -0,0 +1,17 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(
+    interval: float,
+    func: Callable[[], Awaitable[object]],
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await func()
+        except Exception as exc:
+            logger.error(f"Periodic task {func.__qualname__} failed: {exc}")
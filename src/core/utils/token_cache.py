@@ -0,0 +1,61 @@
+import hashlib
+from typing import Any
+
+from core.utils.cache import ExpiringLRUCache
+
+# Клеймы, по которым запись сбрасывается при отзыве: сам токен и его семейство
+INVALIDATION_CLAIMS = ("jti", "fid")
+
+
+class VerifiedTokenCache:
+    """
+    Payload уже проверенных JWT по хешу исходного токена, каждая запись живёт до exp токена.
+    Индекс JTI -> хеши позволяет сбросить записи сразу при отзыве токена или его семейства.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.tokens: ExpiringLRUCache[bytes, dict[str, Any]] = ExpiringLRUCache(maxsize)
+        self.invalidations = 0
+        self._by_jti: dict[str, set[bytes]] = {}
+
+    @staticmethod
+    def digest(token: str | bytes) -> bytes:
+        raw = token.encode() if isinstance(token, str) else token
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def get(self, token: str | bytes) -> dict[str, Any] | None:
+        payload = self.tokens.get(self.digest(token))
+        return dict(payload) if payload is not None else None
+
+    def set(self, token: str | bytes, payload: dict[str, Any]) -> None:  # noqa: A003
+        expires_at = payload.get("exp")
+        if not self.maxsize or not isinstance(expires_at, (int, float)):
+            return
+        token_digest = self.digest(token)
+        self.tokens.set(token_digest, dict(payload), expires_at)
+        for claim in INVALIDATION_CLAIMS:
+            if jti := payload.get(claim):
+                self._by_jti.setdefault(jti, set()).add(token_digest)
+        # Индекс не знает о вытеснении из LRU, поэтому время от времени собирается заново
+        if len(self._by_jti) > 2 * self.maxsize:
+            self._rebuild_index()
+
+    def invalidate(self, jti: str) -> None:
+        for token_digest in self._by_jti.pop(jti, ()):
+            self.tokens.discard(token_digest)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.tokens.clear()
+        self._by_jti.clear()
+
+    def _rebuild_index(self) -> None:
+        self._by_jti = {}
+        for token_digest, payload in self.tokens.items():
+            for claim in INVALIDATION_CLAIMS:
+                if jti := payload.get(claim):
+                    self._by_jti.setdefault(jti, set()).add(token_digest)
+
+    def stats(self) -> dict[str, float]:
+        return {**self.tokens.stats(), "invalidations": self.invalidations}
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+from sqlalchemy import Delete, Update, event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList, ColumnElement
+
+from core.utils.cache import ExpiringLRUCache
+from core.utils.event_log import SharedEventLog
+
+logger = logging.getLogger(__name__)
+
+USER_INVALIDATION_CHANNEL = "user_invalidation"
+# Ключ события, по которому сбрасываются все снимки
+ALL_USERS = "*"
+# Изменённые в транзакции id пользователей (None - неизвестно какие), хранятся в session.info
+PENDING_KEY = "user_snapshots_pending"
+
+SnapshotT = TypeVar("SnapshotT")
+UserIds = set[int] | None
+
+
+def _compared_ids(clause: Any, column: ColumnElement[Any]) -> UserIds:
+    if not isinstance(clause, BinaryExpression) or getattr(clause.left, "key", None) != column.key:
+        return None
+    value = getattr(clause.right, "value", None)
+    if clause.operator is operators.eq and isinstance(value, int):
+        return {value}
+    if clause.operator is operators.in_op and isinstance(value, (list, tuple)):
+        return {int(item) for item in value}
+    return None
+
+
+def ids_in_criteria(criteria: Any, column: ColumnElement[Any]) -> UserIds:
+    """id из условия вида `id = x AND ...` или `id IN (...) AND ...`; None, если условие сложнее."""
+    clauses = [criteria]
+    if isinstance(criteria, BooleanClauseList) and criteria.operator is operators.and_:
+        clauses = list(criteria.clauses)
+    for clause in clauses:
+        if (user_ids := _compared_ids(clause, column)) is not None:
+            return user_ids
+    return None
+
+
+class UserSnapshotCache(Generic[SnapshotT]):
+    """
+    Снимки пользователей по id с TTL и вытеснением LRU. Изменения строк модели в сессиях
+    SQLAlchemy сбрасывают снимки после commit, а при заданном event_log - и у других воркеров.
+    Снимок, прочитанный до сброса, в кэш не попадает: set() сверяет номер поколения.
+    Момент последнего изменения пользователя хранится change_ttl секунд, чтобы судить
+    о свежести данных, выданных раньше (например, профиля в клеймах токена).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        event_log: SharedEventLog | None = None,
+        change_ttl: float = 0.0,
+        max_changes: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = ttl
+        self.change_ttl = change_ttl
+        self.max_changes = max_changes
+        self.clock = clock
+        self.event_log = event_log
+        self.snapshots: ExpiringLRUCache[int, SnapshotT] = ExpiringLRUCache(maxsize, clock)
+        self.generation = 0
+        self.invalidations = 0
+        self.stale_skips = 0
+        # Об изменениях до старта процесса ничего не известно, поэтому они датируются стартом
+        self.all_changed_at = clock()
+        self.changed_at: dict[int, float] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        if event_log is not None:
+            event_log.subscribe(USER_INVALIDATION_CHANNEL, self._apply_published)
+
+    def get(self, user_id: int) -> SnapshotT | None:
+        return self.snapshots.get(user_id)
+
+    def changed_since(self, user_id: int, issued_at: float) -> bool:
+        # iat хранится в целых секундах: изменение в ту же секунду считается более поздним
+        return issued_at <= max(self.all_changed_at, self.changed_at.get(user_id, self.all_changed_at))
+
+    def set(self, user_id: int, snapshot: SnapshotT, generation: int) -> None:  # noqa: A003
+        if generation != self.generation:
+            self.stale_skips += 1
+            return
+        if self.ttl > 0:
+            self.snapshots.set(user_id, snapshot, self.clock() + self.ttl)
+
+    def invalidate(self, user_ids: Iterable[int] | None = None) -> None:
+        """Сбрасывает снимки указанных пользователей (None - всех) и сообщает об этом другим воркерам."""
+        keys = [ALL_USERS] if user_ids is None else [str(user_id) for user_id in user_ids]
+        changed_at = self.clock()
+        self._discard(keys, changed_at)
+        if self.event_log is not None and keys:
+            self._publish(self.event_log, keys, changed_at)
+
+    def clear(self) -> None:
+        self.snapshots.clear()
+        self.generation += 1
+
+    def watch(self, model: Any) -> None:
+        """Подписывает кэш на изменения строк model во всех сессиях SQLAlchemy."""
+        mapper = inspect(model)
+        column = mapper.primary_key[0]
+
+        def after_flush(session: Session, flush_context: Any) -> None:
+            changed = [obj for obj in (*session.new, *session.dirty, *session.deleted) if inspect(obj).mapper is mapper]
+            if changed:
+                _remember(session, {mapper.primary_key_from_instance(obj)[0] for obj in changed})
+
+        def do_orm_execute(state: ORMExecuteState) -> None:
+            statement = state.statement
+            if isinstance(statement, (Update, Delete)) and state.bind_mapper is mapper:
+                _remember(state.session, ids_in_criteria(statement.whereclause, column))
+
+        event.listen(Session, "after_flush", after_flush)
+        event.listen(Session, "do_orm_execute", do_orm_execute)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", _forget)
+
+    async def start(self) -> None:
+        if self.event_log is not None:
+            await self.event_log.start()
+
+    async def stop(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.event_log is not None:
+            await self.event_log.stop()
+
+    def _after_commit(self, session: Session) -> None:
+        if PENDING_KEY in session.info:
+            self.invalidate(session.info.pop(PENDING_KEY))
+
+    def _discard(self, keys: list[str], changed_at: float) -> None:
+        self.generation += 1
+        if ALL_USERS in keys:
+            self.invalidations += len(self.snapshots)
+            self.snapshots.clear()
+            self.all_changed_at = max(self.all_changed_at, changed_at)
+            return
+        for key in keys:
+            user_id = int(key)
+            self.snapshots.discard(user_id)
+            self.invalidations += 1
+            self.changed_at[user_id] = max(changed_at, self.changed_at.get(user_id, changed_at))
+        if len(self.changed_at) > self.max_changes:
+            self._purge_changes()
+
+    def _purge_changes(self) -> None:
+        oldest = self.clock() - self.change_ttl
+        self.changed_at = {
+            user_id: changed_at for user_id, changed_at in self.changed_at.items() if changed_at > oldest
+        }
+        # Свежих изменений слишком много: считаем изменившимися всех пользователей
+        if len(self.changed_at) > self.max_changes:
+            self.all_changed_at = max(self.all_changed_at, *self.changed_at.values())
+            self.changed_at.clear()
+
+    def _apply_published(self, key: str, changed_at: float) -> None:
+        self._discard([key], changed_at)
+
+    def _publish(self, event_log: SharedEventLog, keys: list[str], changed_at: float) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._publish_keys(event_log, keys, changed_at))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish_keys(self, event_log: SharedEventLog, keys: list[str], changed_at: float) -> None:
+        # Событие нужно, пока живы чужие снимки и выданные до изменения данные
+        expires_at = changed_at + max(self.ttl, self.change_ttl)
+        try:
+            for key in keys:
+                await event_log.publish(USER_INVALIDATION_CHANNEL, key, changed_at, expires_at)
+        except Exception as exc:
+            logger.error(f"Failed to publish user invalidation: {exc}")
+
+    def stats(self) -> dict[str, float]:
+        return {
+            **self.snapshots.stats(),
+            "invalidations": self.invalidations,
+            "stale_skips": self.stale_skips,
+            "changed_users": len(self.changed_at),
+        }
+
+
+def _remember(session: Session, user_ids: UserIds) -> None:
+    pending = session.info.get(PENDING_KEY, set())
+    session.info[PENDING_KEY] = None if user_ids is None or pending is None else pending | user_ids
+
+
+def _forget(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.models import Base
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    Копит строки для вставки и пишет их одним multi-row INSERT
+    по достижении batch_size или раз в flush_interval.
+    Когда очередь заполнена, put() ждёт, пока фоновая запись её разгрузит, но не дольше timeout.
+    Если батч отвергнут БД, строки вставляются по одной, а отвергнутые по отдельности
+    (дубликат ключа, слишком длинное значение) записываются в лог и отбрасываются.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        model: type[Base],
+        batch_size: int = 200,
+        flush_interval: float = 0.2,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.flushed_total = 0
+        self.batches_total = 0
+        self.failures_total = 0
+        self.dropped_total = 0
+        self.last_flush_ms = 0.0
+        self._rows: list[dict[str, Any]] = []
+        self._not_full = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def put(self, row: dict[str, Any], timeout: float | None = None) -> bool:
+        """Ставит строку в очередь; False - очередь не освободилась за timeout, строка не принята."""
+        async with self._not_full:
+            try:
+                await asyncio.wait_for(self._not_full.wait_for(lambda: len(self._rows) < self.max_queue), timeout)
+            except asyncio.TimeoutError:
+                return False
+            self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._rows:
+                batch = self._rows[: self.batch_size]
+                started = time.perf_counter()
+                try:
+                    await self._insert(batch)
+                except (IntegrityError, DataError) as exc:
+                    logger.warning(f"Write-behind batch of {len(batch)} rows rejected, inserting one by one: {exc}")
+                    await self._insert_separately(batch)
+                # Строки удаляются из очереди только после успешного commit
+                del self._rows[: len(batch)]
+                self.last_flush_ms = (time.perf_counter() - started) * 1000
+                self.flushed_total += len(batch)
+                self.batches_total += 1
+                async with self._not_full:
+                    self._not_full.notify_all()
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(self.model).values(rows))
+            await session.commit()
+
+    async def _insert_separately(self, batch: list[dict[str, Any]]) -> None:
+        for position, row in enumerate(batch):
+            try:
+                await self._insert([row])
+            except (IntegrityError, DataError) as exc:
+                self.dropped_total += 1
+                logger.error(f"Dropped {self.model.__name__} row rejected by the database: {exc}")
+            except Exception:
+                # Сбой не из-за самой строки (например, нет связи с БД): уже записанные строки
+                # убираем из очереди, остальные останутся до следующей попытки
+                del self._rows[:position]
+                raise
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._stopping = False
+            self._worker = asyncio.create_task(self._flush_forever())
+
+    async def stop(self) -> None:
+        # Не отменяем воркер посреди commit, а даём ему дописать текущий батч
+        if self._worker is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
+        await self.flush()
+
+    async def _flush_forever(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as exc:
+                self.failures_total += 1
+                logger.error(f"Write-behind flush of {len(self._rows)} {self.model.__name__} rows failed: {exc}")
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "pending": len(self._rows),
+            "flushed_total": self.flushed_total,
+            "batches_total": self.batches_total,
+            "failures_total": self.failures_total,
+            "dropped_total": self.dropped_total,
+            "last_flush_ms": self.last_flush_ms,
+        }
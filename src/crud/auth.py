@@ -1,42 +1,209 @@
+import asyncio
 import logging
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, NoReturn
 
-from argon2 import PasswordHasher
-from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
 from fastapi import HTTPException, Request, status
 from fastapi.security import HTTPBasic
 from pydantic import SecretStr
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from core.models import TokenBlacklist, User
+from core.models.db_helper import db_helper
 from core.schemas.auth import TokenType
+from core.schemas.users import UserProfile
+from core.settings import settings
+from core.utils.admission import AdmissionRejectedError
+from core.utils.bloom import BloomFilter
+from core.utils.cache import ExpiringLRUCache
+from core.utils.event_log import shared_event_log
+from core.utils.hashing import password_hasher, verification_limiter
+from core.utils.revocation_store import create_revocation_store
+from core.utils.token_cache import VerifiedTokenCache
+from core.utils.user_cache import UserSnapshotCache
+from core.utils.write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
-# Добавляем кэш для хранения отозванных токенов (заменить на Redis в продакшене)
-REVOKED_TOKENS_CACHE = set()
+# Кэш отозванных токенов: JTI хранится только до истечения самого токена
+REVOKED_TOKENS_CACHE: ExpiringLRUCache[str, bool] = ExpiringLRUCache(
+    maxsize=settings.revocation.cache_max_entries,
+)
+
+# Payload проверенных JWT, чтобы не проверять подпись одного и того же токена на каждом запросе
+VERIFIED_TOKENS_CACHE = VerifiedTokenCache(
+    maxsize=settings.jwt_crypto.verified_cache_max_entries,
+)
+
+# Снимки пользователей для get_principal, сбрасываются при любом изменении строки users
+USER_SNAPSHOTS: UserSnapshotCache[UserProfile] = UserSnapshotCache(
+    maxsize=settings.user_cache.max_entries,
+    ttl=settings.user_cache.ttl_seconds,
+    event_log=shared_event_log if settings.user_cache.backend == "shared" else None,
+    # Профиль в клеймах актуален, пока не изменился пользователь, и нужен не дольше access-токена
+    change_ttl=settings.auth_jwt.access_exp_minutes * 60,
+)
+USER_SNAPSHOTS.watch(User)
+
+# Только столбцы, нужные снимку
+USER_PROFILE_COLUMNS = [getattr(User, name) for name in UserProfile.model_fields]
 
 security = HTTPBasic()
-ph = PasswordHasher()
+
+# Запас на расхождение часов между воркерами при инкрементальной синхронизации фильтра
+FILTER_SYNC_OVERLAP = timedelta(seconds=60)
+
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+class RevokedTokensFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.ready = False
+        self.synced_until: datetime | None = None
+
+    def add(self, token_jti: str) -> None:
+        self.bloom.add(token_jti)
+
+    def might_contain(self, token_jti: str) -> bool:
+        # Пока фильтр не загружен из БД, он не может ничего гарантировать
+        return not self.ready or token_jti in self.bloom
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        stmt = select(TokenBlacklist.jti, TokenBlacklist.revoked_at).where(TokenBlacklist.reason.is_not(None))
+        rows = (await session.execute(stmt)).all()
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        for jti, _ in rows:
+            bloom.add(jti)
+        self.bloom = bloom
+        self.synced_until = max((revoked_at for _, revoked_at in rows if revoked_at), default=None)
+        self.ready = True
+        logger.info(f"Revoked tokens filter rebuilt: {self.bloom.stats()}")
+
+    async def sync(self, session: AsyncSession) -> None:
+        if not self.ready:
+            return await self.rebuild(session)
+        stmt = select(TokenBlacklist.jti, TokenBlacklist.revoked_at).where(TokenBlacklist.reason.is_not(None))
+        if self.synced_until is not None:
+            stmt = stmt.where(TokenBlacklist.revoked_at >= self.synced_until - FILTER_SYNC_OVERLAP)
+        for jti, revoked_at in await session.execute(stmt):
+            self.bloom.add(jti)
+            if revoked_at and (self.synced_until is None or revoked_at > self.synced_until):
+                self.synced_until = revoked_at
+
+    def stats(self) -> dict[str, float]:
+        return {"ready": self.ready, **self.bloom.stats()}
+
+
+revoked_tokens_filter = RevokedTokensFilter(
+    capacity=settings.revocation.filter_capacity,
+    error_rate=settings.revocation.filter_error_rate,
+)
+
+
+class ExpiredTokenRecordsPurger:
+    """
+    Удаляет записи об истёкших токенах пачками по batch_size строк,
+    каждая в своей короткой транзакции, чтобы не держать долгих блокировок.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.runs_total = 0
+        self.purged_total = 0
+        self.last_run_purged = 0
+        self.last_run_ms = 0.0
+
+    async def purge(self) -> int:
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        # Срок записей, созданных до появления expires_at, оцениваем по refresh-токену
+        legacy_expired_before = now - timedelta(minutes=settings.auth_jwt.refresh_exp_minutes)
+        expired = or_(
+            TokenBlacklist.expires_at < now,
+            and_(TokenBlacklist.expires_at.is_(None), TokenBlacklist.created_at < legacy_expired_before),
+        )
+        purged = 0
+        while True:
+            async with self.session_factory() as session:
+                ids = list(await session.scalars(select(TokenBlacklist.id).where(expired).limit(self.batch_size)))
+                if ids:
+                    await session.execute(delete(TokenBlacklist).where(TokenBlacklist.id.in_(ids)))
+                    await session.commit()
+            purged += len(ids)
+            if len(ids) < self.batch_size:
+                break
+            # Между пачками отдаём управление обработке запросов
+            await asyncio.sleep(0)
+        self.runs_total += 1
+        self.purged_total += purged
+        self.last_run_purged = purged
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        if purged:
+            logger.info(f"Purged expired token records: {self.stats()}")
+        return purged
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "runs_total": self.runs_total,
+            "purged_total": self.purged_total,
+            "last_run_purged": self.last_run_purged,
+            "last_run_ms": self.last_run_ms,
+        }
 
 
-def verify_password(
+revocation_store = create_revocation_store(
+    backend=settings.revocation.backend,
+    cache=REVOKED_TOKENS_CACHE,
+    # Отсечка нужна, пока жив самый долгоживущий из выданных до неё токенов
+    cutoff_ttl=settings.auth_jwt.refresh_exp_minutes * 60,
+    event_log=shared_event_log,
+)
+# Отзывы, пришедшие от других воркеров, тоже попадают в Bloom-фильтр
+revocation_store.subscribe(revoked_tokens_filter.add)
+# Отозванный токен сразу пропадает из кэша проверенных
+revocation_store.subscribe(VERIFIED_TOKENS_CACHE.invalidate)
+
+token_record_writer = WriteBehindQueue(
+    session_factory=db_helper.session_factory,
+    model=TokenBlacklist,
+    batch_size=settings.token_records.batch_size,
+    flush_interval=settings.token_records.flush_interval_seconds,
+    max_queue=settings.token_records.max_queue,
+)
+
+token_records_purger = ExpiredTokenRecordsPurger(
+    session_factory=db_helper.session_factory,
+    batch_size=settings.token_records.purge_batch_size,
+)
+
+
+async def verify_password(
     hashed_password: str | bytes,
     plain_password: str | bytes,
 ) -> bool:
     try:
-        ph.verify(hashed_password, plain_password.encode("utf-8"))
-    except (
-        InvalidHashError,
-        VerifyMismatchError,
-        VerificationError,
-    ):
-        return False
-    return True
+        async with verification_limiter.slot():
+            return await password_hasher.verify(hashed_password, plain_password)
+    except AdmissionRejectedError as exc:
+        logger.warning(f"Password verification rejected, queue is full: {verification_limiter.stats()}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Try again later.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
 
 
-def _validate_user_active(user: User) -> None:
+def _validate_user_active(user: User | UserProfile) -> None:
     if not user.is_active:
         logger.warning(f"Login attempt for inactive user: {user.id}")
         raise HTTPException(
@@ -53,37 +220,142 @@ async def get_auth_user(
     stmt = select(User).where(User.nickname == username)
     user = await session.scalar(stmt)
 
-    if not user or not verify_password(str(user.password), password.get_secret_value()):
+    if not user or not await verify_password(str(user.password), password.get_secret_value()):
         logger.warning(f"Invalid login attempt for user: {username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
     _validate_user_active(user)
+    if password_hasher.check_needs_rehash(user.password):
+        schedule_password_rehash(user.id, user.password, password)
 
     return user
 
 
-async def get_user_by_id(
+async def rehash_password(
+    user_id: int,
+    old_hash: str,
+    password: SecretStr,
+) -> None:
+    new_hash = await password_hasher.hash(password.get_secret_value())
+    async with db_helper.session_factory() as session:
+        # Условие по старому хешу защищает от гонки со сменой пароля
+        stmt = update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+        await session.execute(stmt)
+        await session.commit()
+    logger.info(f"Password hash upgraded for user: {user_id}")
+
+
+def _log_rehash_failure(task: asyncio.Task[None]) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and (exc := task.exception()):
+        logger.error(f"Password rehash failed: {exc}")
+
+
+def schedule_password_rehash(
+    user_id: int,
+    old_hash: str,
+    password: SecretStr,
+) -> None:
+    task = asyncio.create_task(rehash_password(user_id, old_hash, password))
+    _background_tasks.add(task)
+    task.add_done_callback(_log_rehash_failure)
+
+
+class Principal:
+    """
+    Пользователь текущего запроса. Снимок профиля приходит вместе с проверкой отзыва токена,
+    полная ORM-модель загружается, только если она понадобилась обработчику.
+    """
+
+    def __init__(self, profile: UserProfile, token_payload: dict[str, Any]) -> None:
+        self.profile = profile
+        self.token_payload = token_payload
+        self._user: User | None = None
+
+    @property
+    def id(self) -> int:  # noqa: A003, VNE003
+        return self.profile.id
+
+    @property
+    def is_superuser(self) -> bool:
+        return self.profile.is_superuser
+
+    async def get_user(self, session: AsyncSession) -> User:
+        if self._user is None:
+            user = await session.get(User, self.id)
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found",
+                )
+            self._user = user
+        return self._user
+
+
+def _raise_token_revoked() -> NoReturn:
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Token revoked",
+    )
+
+
+async def _load_principal_row(
     session: AsyncSession,
     user_id: int,
-) -> User:
-    stmt = select(User).where(User.id == user_id)
-    user = await session.scalar(stmt)
-    if not user:
+    jtis: list[str],
+) -> UserProfile | None:
+    generation = USER_SNAPSHOTS.generation
+    stmt = select(*USER_PROFILE_COLUMNS).where(User.id == user_id)
+    if jtis:
+        # Запись об отзыве присоединяется к строке пользователя: один запрос вместо двух
+        revoked = and_(TokenBlacklist.jti.in_(jtis), TokenBlacklist.reason.is_not(None))
+        stmt = stmt.add_columns(TokenBlacklist).outerjoin(TokenBlacklist, revoked).limit(1)
+    row = (await session.execute(stmt)).first()
+    if not row:
+        return None
+    if jtis and (blacklisted := row._mapping[TokenBlacklist]) is not None:
+        revocation_store.remember(blacklisted.jti, token_expires_at(blacklisted))
+        _raise_token_revoked()
+    profile = UserProfile.model_validate({name: row._mapping[name] for name in UserProfile.model_fields})
+    USER_SNAPSHOTS.set(user_id, profile, generation)
+    return profile
+
+
+async def get_principal(
+    session: AsyncSession,
+    token_payload: dict[str, Any],
+    user_id: int,
+    profile: UserProfile | None = None,
+) -> Principal:
+    jtis = _token_jtis(token_payload.get("jti", ""), token_payload.get("fid"))
+    if _revoked_without_database(jtis, user_id, token_payload.get("iat")):
+        _raise_token_revoked()
+    # В БД идём, только если токен может быть отозван или профиля нет ни в клеймах, ни в кэше
+    check_jtis = [jti for jti in jtis if revoked_tokens_filter.might_contain(jti)]
+    profile = profile or USER_SNAPSHOTS.get(user_id)
+    if profile is None or check_jtis:
+        profile = await _load_principal_row(session, user_id, check_jtis)
+    if profile is None:
         logger.error(f"User not found: {user_id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    _validate_user_active(user)
-    return user
+    _validate_user_active(profile)
+    return Principal(profile, token_payload)
 
 
 async def get_all_users(
     session: AsyncSession,
+    limit: int,
+    after_id: int | None = None,
 ) -> list[User]:
-    stmt = select(User).order_by(User.id)
+    # Keyset-пагинация: диапазон по первичному ключу не зависит от глубины страницы
+    stmt = select(User).order_by(User.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
     users = await session.scalars(stmt)
     return list(users)
 
@@ -94,48 +366,101 @@ async def create_jwt_record(
     user_id: int,
     token_type: TokenType,
     request: Request | None = None,
+    commit: bool = True,
+    expires_at: datetime | None = None,
 ) -> None:
-    jwt_record = TokenBlacklist(
-        jti=jti,
-        user_id=user_id,
-        token_type=token_type,
-        ip_address=request.client.host if request else None,
-        user_agent=request.headers.get("user-agent") if request else None,
-        created_at=datetime.now(timezone.utc),
-    )
-    session.add(jwt_record)
-    await session.commit()
+    jwt_record = {
+        "jti": jti,
+        "user_id": int(user_id),
+        "token_type": token_type,
+        "ip_address": request.client.host if request else None,
+        "user_agent": request.headers.get("user-agent") if request else None,
+        "created_at": datetime.now(timezone.utc),
+        "expires_at": expires_at,
+    }
+    # Если очередь так и не освободилась, запись идёт в БД сразу, а не блокирует вход
+    if token_record_writer.running and await token_record_writer.put(
+        jwt_record,
+        timeout=settings.token_records.put_timeout_seconds,
+    ):
+        return
+    session.add(TokenBlacklist(**jwt_record))
+    if commit:
+        await session.commit()
 
 
-async def is_token_revoked(
-    session: AsyncSession,
-    token_jti: str,
-) -> bool:
-    if token_jti in REVOKED_TOKENS_CACHE:
-        return True
-    stmt = select(TokenBlacklist).where(TokenBlacklist.jti == token_jti)
-    blacklisted = await session.scalar(stmt)
-    if blacklisted and blacklisted.reason:
+def _as_utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def token_expires_at(token: TokenBlacklist) -> float:
+    if token.expires_at is not None:
+        return _as_utc(token.expires_at).timestamp()
+    created_at = _as_utc(token.created_at)
+    if token.token_type == "access":  # noqa: S105
+        lifetime = timedelta(minutes=settings.auth_jwt.access_exp_minutes)
+    else:
+        lifetime = timedelta(minutes=settings.auth_jwt.refresh_exp_minutes)
+    return (created_at + lifetime).timestamp()
+
+
+async def _publish_revoked(token: TokenBlacklist) -> None:
+    await revocation_store.revoke(token.jti, token_expires_at(token))
+
+
+async def sync_user_token_cutoffs(session: AsyncSession) -> None:
+    since = datetime.now(timezone.utc) - timedelta(minutes=settings.auth_jwt.refresh_exp_minutes)
+    if revocation_store.latest_user_cutoff is not None:
+        latest = datetime.fromtimestamp(revocation_store.latest_user_cutoff, timezone.utc)
+        since = max(since, latest - FILTER_SYNC_OVERLAP)
+    stmt = select(User.id, User.tokens_valid_after).where(User.tokens_valid_after >= since)
+    for user_id, valid_after in await session.execute(stmt):
+        if valid_after is not None:
+            revocation_store.remember_user_cutoff(user_id, _as_utc(valid_after).timestamp())
+    revocation_store.purge_user_cutoffs()
+
+
+def _revoked_without_database(jtis: list[str], user_id: int | None, issued_at: float | None) -> bool:
+    if user_id is not None and issued_at is not None and revocation_store.issued_before_cutoff(user_id, issued_at):
         return True
-    return False
+    return any(revocation_store.is_revoked(jti) for jti in jtis)
+
+
+def _token_jtis(token_jti: str, family_jti: str | None) -> list[str]:
+    # Access-токен отозван и тогда, когда отозван refresh-токен его семейства
+    return [token_jti, family_jti] if family_jti else [token_jti]
 
 
 async def revoke_token(
     session: AsyncSession,
     token_jti: str,
     reason: str = "user_logout",
+    user_id: int | None = None,
+    expires_at: float | None = None,
 ) -> None:
+    # Запись о недавно выданном токене может ещё лежать в очереди write-behind
+    await token_record_writer.flush()
     stmt = select(TokenBlacklist).where(TokenBlacklist.jti == token_jti)
     token = await session.scalar(stmt)
     if not token:
-        HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Token(s) not found",
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Token(s) not found",
+            )
+        # Access-токен без записи в БД: заносим в denylist только сам факт отзыва
+        token = TokenBlacklist(
+            jti=token_jti,
+            user_id=user_id,
+            token_type="access",  # noqa: S106
+            created_at=datetime.now(timezone.utc),
+            expires_at=datetime.fromtimestamp(expires_at, timezone.utc) if expires_at else None,
         )
+        session.add(token)
     token.reason = reason
     token.revoked_at = datetime.now(timezone.utc)
     await session.commit()
-    REVOKED_TOKENS_CACHE.add(token_jti)
+    await revocation_store.revoke(token.jti, expires_at or token_expires_at(token))
 
 
 async def revoke_all_user_tokens(
@@ -143,15 +468,21 @@ async def revoke_all_user_tokens(
     user_id: int,
     reason: str = "user_logout",
 ) -> None:
-    stmt = select(TokenBlacklist).where(TokenBlacklist.user_id == user_id)
-    tokens = await session.scalars(stmt)
-    if not tokens:
-        HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tokens not found",
-        )
-    for token in tokens:
-        token.reason = reason
-        token.revoked_at = datetime.now(timezone.utc)
-        REVOKED_TOKENS_CACHE.add(token.jti)
+    await token_record_writer.flush()
+    revoked_at = datetime.now(timezone.utc)
+    await session.execute(
+        update(TokenBlacklist)
+        .where(TokenBlacklist.user_id == user_id, TokenBlacklist.reason.is_(None))
+        .values(reason=reason, revoked_at=revoked_at),
+    )
+    await session.execute(update(User).where(User.id == user_id).values(tokens_valid_after=revoked_at))
+    # Токены, выданные в ту же секунду, отсечка по iat не покрывает - их JTI рассылаем явно
+    stmt = select(TokenBlacklist).where(
+        TokenBlacklist.user_id == user_id,
+        TokenBlacklist.created_at >= revoked_at.replace(microsecond=0),
+    )
+    same_second_tokens = list(await session.scalars(stmt))
     await session.commit()
+    await revocation_store.revoke_user(user_id, revoked_at.timestamp())
+    for token in same_second_tokens:
+        await _publish_revoked(token)
@@ -1,13 +1,14 @@
-from argon2 import PasswordHasher
+from typing import Any, AsyncIterator
+
 from fastapi import HTTPException
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette import status
 
 from core.models import User
 from core.schemas.users import UserCreate
-
-ph = PasswordHasher()
+from core.utils.hashing import password_hasher
 
 
 async def create_user(
@@ -15,7 +16,7 @@ async def create_user(
     user_create: UserCreate,
 ) -> User:
     user_data = user_create.model_dump()
-    user_data["password"] = ph.hash(user_data["password"])
+    user_data["password"] = await password_hasher.hash(user_data["password"])
     try:
         user = User(**user_data)
         session.add(user)
@@ -38,3 +39,17 @@ async def create_user(
             detail="Could not create user",
         )
     return user
+
+
+async def stream_users(
+    session_factory: async_sessionmaker[AsyncSession],
+    fields: list[str],
+    chunk_size: int,
+) -> AsyncIterator[dict[str, Any]]:
+    # Своя сессия живёт, пока читается ответ: сессия запроса к этому времени уже закрыта
+    async with session_factory() as session:
+        # Только нужные столбцы: хеш пароля и ORM-объекты в выгрузку не попадают
+        columns = [getattr(User, field) for field in fields]
+        stmt = select(*columns).order_by(User.id).execution_options(yield_per=chunk_size)
+        async for row in await session.stream(stmt):
+            yield dict(row._mapping)
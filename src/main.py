@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
@@ -7,22 +8,79 @@ import uvicorn
 from fastapi import FastAPI
 
 from api import router as api_router
+from api.api_v1.auth.utils import RATE_LIMIT_DATA
+from api.middleware import RateLimitMiddleware, default_rate_limit_rules
+from api.well_known import router as well_known_router
+from core.models.db_helper import db_helper
 from core.settings import settings
+from core.utils.hashing import password_hasher
+from core.utils.jwt_signer import jwt_crypto
+from core.utils.tasks import run_periodically
+from crud.auth import (
+    USER_SNAPSHOTS,
+    revocation_store,
+    revoked_tokens_filter,
+    sync_user_token_cutoffs,
+    token_record_writer,
+    token_records_purger,
+)
 
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if settings.password_hash.calibrate:
+        await password_hasher.calibrate(
+            target_ms=settings.password_hash.target_ms,
+            max_memory_kib=settings.password_hash.max_memory_kib,
+            max_parallelism=settings.password_hash.max_parallelism,
+        )
+    async with db_helper.session_factory() as session:
+        await revoked_tokens_filter.rebuild(session)
+        await sync_user_token_cutoffs(session)
+    await revocation_store.start()
+    await USER_SNAPSHOTS.start()
+    if settings.token_records.write_behind:
+        await token_record_writer.start()
+
+    async def sync_revoked_tokens_filter() -> None:
+        async with db_helper.session_factory() as session:
+            await revoked_tokens_filter.sync(session)
+            await sync_user_token_cutoffs(session)
+
+    filter_sync = asyncio.create_task(
+        run_periodically(settings.revocation.filter_sync_seconds, sync_revoked_tokens_filter),
+    )
+    records_purge = asyncio.create_task(
+        run_periodically(settings.token_records.purge_interval_seconds, token_records_purger.purge),
+    )
     yield
+    filter_sync.cancel()
+    records_purge.cancel()
+    await token_record_writer.stop()
+    # Сначала дожидаемся публикаций сброса снимков: общий журнал событий закрывается вместе с ними
+    await USER_SNAPSHOTS.stop()
+    await revocation_store.stop()
+    password_hasher.shutdown()
+    jwt_crypto.shutdown()
+    RATE_LIMIT_DATA.close()
 
 
 main_app = FastAPI(
     lifespan=lifespan,
 )
+main_app.add_middleware(
+    RateLimitMiddleware,
+    store=RATE_LIMIT_DATA,
+    rules=default_rate_limit_rules(),
+)
 main_app.include_router(
     api_router,
 )
+main_app.include_router(
+    well_known_router,
+)
 
 
 if __name__ == "__main__":
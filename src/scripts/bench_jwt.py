@@ -0,0 +1,62 @@
+"""Пропускная способность подписи и проверки JWT: PyJWT с PEM на каждом вызове против JWTSigner.
+
+Запуск из папки `src`:
+
+    python -m scripts.bench_jwt --tokens 2000
+"""
+
+import argparse
+import time
+import uuid
+from typing import Any, Callable
+
+import jwt
+
+from core.settings import settings
+from core.utils.jwt_signer import JWTSigner
+
+
+def throughput(func: Callable[[], Any], tokens: int) -> float:
+    started = time.perf_counter()
+    for _ in range(tokens):
+        func()
+    return tokens / (time.perf_counter() - started)
+
+
+def report(title: str, before: float, after: float) -> None:
+    print(f"{title:<8} PEM per call {before:10.0f} tok/s   JWTSigner {after:10.0f} tok/s   x{after / before:5.2f}")
+
+
+def main(tokens: int) -> None:
+    private_key, public_key = settings.auth_jwt.private_key, settings.auth_jwt.public_key
+    algorithm = settings.auth_jwt.algorithm
+    signer = JWTSigner(private_key, public_key, algorithm)
+    payload = {
+        "sub": "1",
+        "type": "access",
+        "username": "bench_user",
+        "email": "bench@example.com",
+        "iat": int(time.time()),
+        "exp": int(time.time()) + 900,
+        "jti": str(uuid.uuid4()),
+    }
+    token = signer.encode(payload)
+
+    print(f"{algorithm}, {tokens} tokens")
+    report(
+        "sign",
+        throughput(lambda: jwt.encode(payload, private_key, algorithm), tokens),
+        throughput(lambda: signer.encode(payload), tokens),
+    )
+    report(
+        "verify",
+        throughput(lambda: jwt.decode(token, public_key, algorithms=[algorithm]), tokens),
+        throughput(lambda: signer.decode(token), tokens),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.tokens)
@@ -0,0 +1,65 @@
+"""Сравнение алгоритмов подписи JWT: скорость подписи и проверки и размер токена.
+
+Ключи генерируются на лету. Запуск из папки `src`:
+
+    python -m scripts.bench_jwt_algorithms --tokens 2000
+"""
+
+import argparse
+import time
+import uuid
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from core.utils.jwt_signer import JWTSigner
+from scripts.bench_jwt import throughput
+
+
+def generate_keys(algorithm: str) -> tuple[str, str]:
+    private_key: Any
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def main(algorithms: list[str], tokens: int) -> None:
+    payload = {
+        "sub": "1",
+        "type": "access",
+        "username": "bench_user",
+        "email": "bench@example.com",
+        "iat": int(time.time()),
+        "exp": int(time.time()) + 900,
+        "jti": str(uuid.uuid4()),
+    }
+    print(f"{tokens} tokens per measurement")
+    print(f"{'algorithm':<10} {'sign tok/s':>12} {'verify tok/s':>14} {'token bytes':>12}")
+    for algorithm in algorithms:
+        signer = JWTSigner(*generate_keys(algorithm), algorithm)
+        token = signer.encode(payload)
+        sign = throughput(lambda: signer.encode(payload), tokens)  # noqa: B023
+        verify = throughput(lambda: signer.decode(token), tokens)  # noqa: B023
+        print(f"{algorithm:<10} {sign:12.0f} {verify:14.0f} {len(token):12d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--algorithms", nargs="+", default=["RS256", "ES256", "EdDSA"])
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.algorithms, args.tokens)
@@ -0,0 +1,137 @@
+"""Латентность /me во время всплеска логинов.
+
+Запуск из папки `src`:
+
+    python -m scripts.bench_me_latency --logins 64 --concurrency 4 --samples 200
+    python -m scripts.bench_me_latency --inline  # Argon2 прямо в event loop, как было раньше
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncGenerator
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.models import Base
+from core.models.db_helper import db_helper
+from core.utils.hashing import _hash_password, _verify_password, password_hasher
+from main import main_app
+
+PASSWORD = "bench_password"  # noqa: S105
+
+
+def use_inline_hashing() -> None:
+    async def hash_inline(password: str) -> str:
+        return _hash_password(password_hasher.hasher, password)
+
+    async def verify_inline(hashed_password: str | bytes, password: str | bytes) -> bool:
+        return _verify_password(password_hasher.hasher, hashed_password, password)
+
+    password_hasher.hash = hash_inline  # type: ignore[method-assign]
+    password_hasher.verify = verify_inline  # type: ignore[method-assign]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(title: str, samples: list[float]) -> None:
+    print(
+        f"{title:<28} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:8.2f} ms  "
+        f"p99={percentile(samples, 99) * 1000:8.2f} ms  "
+        f"mean={statistics.mean(samples) * 1000:8.2f} ms",
+    )
+
+
+def client_for(ip: str) -> AsyncClient:
+    transport = ASGITransport(app=main_app, client=(ip, 50000))
+    return AsyncClient(transport=transport, base_url="http://bench")
+
+
+async def sample_me(token: str, samples: int) -> list[float]:
+    latencies = []
+    async with client_for("10.255.0.1") as client:
+        for _ in range(samples):
+            started = time.perf_counter()
+            response = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+            await asyncio.sleep(0.002)
+    return latencies
+
+
+async def login(index: int, semaphore: asyncio.Semaphore) -> float:
+    async with semaphore, client_for(f"10.0.{index // 250}.{index % 250 + 1}") as client:
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={"username": "bench_user", "password": PASSWORD},
+        )
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+
+async def main(logins: int, concurrency: int, samples: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'bench.sqlite3'}",
+            connect_args={"timeout": 30},
+        )
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def enable_wal(dbapi_connection: Any, connection_record: Any) -> None:
+            dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async def get_session() -> AsyncGenerator[AsyncSession, None]:
+            async with session_factory() as session:
+                yield session
+
+        main_app.dependency_overrides[db_helper.get_session] = get_session
+        try:
+            async with client_for("10.255.0.2") as client:
+                await client.post(
+                    "/api/v1/users/register",
+                    json={"nickname": "bench_user", "email": "bench@example.com", "password": PASSWORD},
+                )
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    data={"username": "bench_user", "password": PASSWORD},
+                )
+                token = response.json()["access_token"]
+
+            report("/me idle", await sample_me(token, samples))
+            semaphore = asyncio.Semaphore(concurrency)
+            me_task = asyncio.create_task(sample_me(token, samples))
+            login_latencies = await asyncio.gather(*(login(index, semaphore) for index in range(logins)))
+            me_latencies = await me_task
+            report("/me during login burst", me_latencies)
+            report("/login", login_latencies)
+        finally:
+            main_app.dependency_overrides.clear()
+            password_hasher.shutdown()
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop (pre-executor behaviour)")
+    args = parser.parse_args()
+    if args.inline:
+        use_inline_hashing()
+    asyncio.run(main(args.logins, args.concurrency, args.samples))
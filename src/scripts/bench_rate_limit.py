@@ -0,0 +1,85 @@
+"""Память и скорость rate limiter'а на большом числе разных ключей (IP).
+
+Ключи приходят равномерно в течение --windows окон по модельным часам. Каждая реализация
+запускается в отдельном процессе, чтобы прирост RSS не смешивался. Запуск из папки `src`:
+
+    python -m scripts.bench_rate_limit --impl legacy --keys 1000000
+    python -m scripts.bench_rate_limit --impl sliding --keys 1000000
+"""
+
+import argparse
+import resource
+import time
+from typing import Callable
+
+from core.utils.rate_limit import SlidingWindowRateLimiter
+
+MAX_CALLS = 5
+TIME_FRAME = 60
+
+
+class ModelClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def legacy_limiter(clock: ModelClock) -> Callable[[str], bool]:
+    # Прежняя реализация: список отметок времени на IP, ключи никогда не удаляются
+    data: dict[str, list[float]] = {}
+
+    def hit(key: str) -> bool:
+        now = clock()
+        requests_data = [t for t in data.get(key, []) if now - t < TIME_FRAME]
+        if len(requests_data) >= MAX_CALLS:
+            return False
+        requests_data.append(now)
+        data[key] = requests_data
+        return True
+
+    return hit
+
+
+def sliding_limiter(clock: ModelClock) -> Callable[[str], bool]:
+    limiter = SlidingWindowRateLimiter(clock=clock)
+    return lambda key: limiter.check(key, MAX_CALLS, TIME_FRAME).allowed
+
+
+def max_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(impl: str, keys: int, windows: int, hits_per_key: int) -> None:
+    clock = ModelClock()
+    hit = legacy_limiter(clock) if impl == "legacy" else sliding_limiter(clock)
+    step = windows * TIME_FRAME / keys
+    rss_before = max_rss_mib()
+    started = time.perf_counter()
+    for number in range(keys):
+        clock.now += step
+        hit(f"10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}")
+    populate = time.perf_counter() - started
+
+    hot_keys = [f"172.16.0.{number}" for number in range(256)]
+    started = time.perf_counter()
+    for _ in range(hits_per_key):
+        for key in hot_keys:
+            hit(key)
+    hot = time.perf_counter() - started
+
+    print(f"{impl}: {keys} distinct keys over {windows} windows")
+    print(f"  first hit per key   {keys / populate:12.0f} checks/s")
+    print(f"  repeated hot keys   {hits_per_key * len(hot_keys) / hot:12.0f} checks/s")
+    print(f"  RSS growth          {max_rss_mib() - rss_before:12.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--impl", choices=["legacy", "sliding"], default="sliding")
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--windows", type=int, default=10)
+    parser.add_argument("--hits-per-key", type=int, default=200)
+    args = parser.parse_args()
+    main(args.impl, args.keys, args.windows, args.hits_per_key)
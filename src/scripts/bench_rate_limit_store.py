@@ -0,0 +1,51 @@
+"""Накладные расходы одной проверки лимита для хранилищ memory и shared (SQLite WAL).
+
+Запуск из папки `src`:
+
+    python -m scripts.bench_rate_limit_store --checks 20000 --keys 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from core.utils.rate_limit import RateLimitStore, SlidingWindowRateLimiter, SQLiteRateLimitStore
+
+
+async def measure(store: RateLimitStore, checks: int, keys: int) -> list[float]:
+    latencies = []
+    for number in range(checks):
+        started = time.perf_counter()
+        await store.hit(f"10.0.{number % keys >> 8}.{number % keys & 255}", 1_000_000, 60)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(title: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    print(
+        f"{title:<8} mean={statistics.mean(latencies) * 1e6:8.1f} us  "
+        f"p50={ordered[len(ordered) // 2] * 1e6:8.1f} us  "
+        f"p99={ordered[int(len(ordered) * 0.99)] * 1e6:8.1f} us",
+    )
+
+
+async def main(checks: int, keys: int) -> None:
+    report("memory", await measure(SlidingWindowRateLimiter(), checks, keys))
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteRateLimitStore(str(Path(directory) / "rate_limits.sqlite3"))
+        try:
+            report("shared", await measure(store, checks, keys))
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.checks, args.keys))
@@ -3,8 +3,11 @@ from typing import Any, AsyncGenerator
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from pytest_mock import MockerFixture
 
 from core.models import User
+from core.schemas.users import UserProfile
+from crud.auth import Principal
 from main import main_app
 
 from .mock_data import ACCESS_TOKEN, REFRESH_TOKEN, USER
@@ -22,6 +25,19 @@ def mock_user() -> User:
     return User(**USER)
 
 
+@pytest.fixture
+def mock_get_principal(mocker: MockerFixture, mock_user: User) -> Any:
+    async def get_principal(
+        session: Any,
+        token_payload: dict[str, Any],
+        user_id: int,
+        profile: UserProfile | None = None,
+    ) -> Principal:
+        return Principal(profile or UserProfile.model_validate(mock_user), token_payload)
+
+    return mocker.patch("api.api_v1.auth.utils.get_principal", side_effect=get_principal)
+
+
 @pytest.fixture
 def access_token() -> str:
     return ACCESS_TOKEN
@@ -0,0 +1,114 @@
+import base64
+import time
+from typing import Any
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from pytest_mock import MockerFixture
+
+from core.models import User
+from core.schemas.users import UserProfile
+from core.settings import settings
+from crud.auth import Principal
+
+from .mock_data import SUPERUSER, USER
+
+USERS = [User(**{**USER, "id": user_id, "nickname": f"user_{user_id}"}) for user_id in range(1, 6)]
+
+
+async def get_all_users(session: Any, limit: int, after_id: int | None = None) -> list[User]:
+    return [user for user in USERS if after_id is None or user.id > after_id][:limit]
+
+
+class TestAllUsers:
+    @pytest.mark.asyncio
+    async def test_pages_follow_cursor(
+        self,
+        mocker: MockerFixture,
+        async_client: AsyncClient,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        principal = Principal(UserProfile.model_validate(SUPERUSER), valid_access_token_payload)
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
+        mocker.patch("api.api_v1.auth.utils.get_principal", return_value=principal)
+        mocker.patch("api.api_v1.auth.auth.get_all_users", side_effect=get_all_users)
+
+        pages: list[list[int]] = []
+        params: dict[str, Any] = {"limit": 2}
+        while True:
+            result = await async_client.get(
+                url="/api/v1/auth/all_users",
+                headers={"Authorization": "Bearer access_token"},
+                params=params,
+            )
+            assert result.status_code == status.HTTP_200_OK
+            pages.append([user["id"] for user in result.json()["items"]])
+            if not (cursor := result.json()["next_cursor"]):
+                break
+            params["cursor"] = cursor
+        assert pages == [[1, 2], [3, 4], [5]]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "cursor",
+        ["not-a-cursor", base64.urlsafe_b64encode(b"9" * 30).decode()],
+    )
+    async def test_invalid_cursor(
+        self,
+        mocker: MockerFixture,
+        async_client: AsyncClient,
+        valid_access_token_payload: dict[str, Any],
+        cursor: str,
+    ) -> None:
+        principal = Principal(UserProfile.model_validate(SUPERUSER), valid_access_token_payload)
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
+        mocker.patch("api.api_v1.auth.utils.get_principal", return_value=principal)
+
+        result = await async_client.get(
+            url="/api/v1/auth/all_users",
+            headers={"Authorization": "Bearer access_token"},
+            params={"cursor": cursor},
+        )
+        assert result.status_code == status.HTTP_400_BAD_REQUEST
+        assert result.json()["detail"] == "Invalid cursor"
+
+    @pytest.mark.asyncio
+    async def test_forbidden_for_regular_user(
+        self,
+        mocker: MockerFixture,
+        async_client: AsyncClient,
+        valid_access_token_payload: dict[str, Any],
+        mock_get_principal: Any,
+    ) -> None:
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
+
+        result = await async_client.get(
+            url="/api/v1/auth/all_users",
+            headers={"Authorization": "Bearer access_token"},
+        )
+        assert result.status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.asyncio
+    async def test_profile_claims_do_not_grant_superuser(
+        self,
+        mocker: MockerFixture,
+        async_client: AsyncClient,
+        valid_access_token_payload: dict[str, Any],
+        mock_get_principal: Any,
+    ) -> None:
+        # В клеймах is_superuser мог остаться от старого токена: права берутся из снимка или БД
+        payload = {
+            **valid_access_token_payload,
+            "iat": int(time.time()),
+            "profile": {**UserProfile.model_validate(USER).model_dump(exclude={"id"}), "is_superuser": True},
+        }
+        mocker.patch.object(settings.auth_jwt, "profile_claims", True)
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=payload)
+
+        result = await async_client.get(
+            url="/api/v1/auth/all_users",
+            headers={"Authorization": "Bearer claims_token"},
+        )
+        assert result.status_code == status.HTTP_403_FORBIDDEN
+        assert mock_get_principal.call_args.args[3] is None
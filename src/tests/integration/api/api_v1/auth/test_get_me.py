@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 import pytest
@@ -5,7 +6,10 @@ from fastapi import status
 from httpx import AsyncClient
 from pytest_mock import MockerFixture
 
-from core.models import User
+from core.settings import settings
+from core.utils.user_cache import UserSnapshotCache
+from tests.integration.api.api_v1.auth.mock_data import USER
+from tests.unit.core.utils.test_jwt_signer import crafted_token
 
 
 class TestMe:
@@ -15,11 +19,9 @@ class TestMe:
         mocker: MockerFixture,
         async_client: AsyncClient,
         valid_access_token_payload: dict[str, Any],
-        mock_user: User,
+        mock_get_principal: Any,
     ) -> None:
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
-        mocker.patch("api.api_v1.auth.auth.get_user_id", return_value=1)
-        mocker.patch("api.api_v1.auth.auth.get_user_by_id", return_value=mock_user)
 
         result = await async_client.get(
             url="/api/v1/auth/me",
@@ -34,6 +36,45 @@ class TestMe:
         assert response.get("is_active") is True
         assert response.get("is_superuser") is False
 
+    @pytest.mark.asyncio
+    async def test_me_from_profile_claims(
+        self,
+        mocker: MockerFixture,
+        async_client: AsyncClient,
+        valid_access_token_payload: dict[str, Any],
+        mock_get_principal: Any,
+    ) -> None:
+        clock = mocker.Mock(return_value=time.time() - 60)
+        snapshots: UserSnapshotCache[Any] = UserSnapshotCache(maxsize=10, ttl=60, clock=clock)
+        profile = {name: USER[name] for name in ("nickname", "first_name", "last_name", "email")}
+        payload = {
+            **valid_access_token_payload,
+            "iat": int(time.time()),
+            "profile": {**profile, "is_active": True, "is_superuser": False},
+        }
+        mocker.patch.object(settings.auth_jwt, "profile_claims", True)
+        mocker.patch("api.api_v1.auth.utils.USER_SNAPSHOTS", snapshots)
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=payload)
+
+        result = await async_client.get(
+            url="/api/v1/auth/me",
+            headers={"Authorization": "Bearer claims_token"},
+        )
+        assert result.status_code == status.HTTP_200_OK
+        assert result.json()["email"] == USER["email"]
+        # Профиль из клеймов передан дальше, загружать пользователя не нужно
+        assert mock_get_principal.call_args.args[3] is not None
+
+        # После изменения пользователя профиль из клеймов устарел
+        clock.return_value = time.time() + 1
+        snapshots.invalidate([1])
+        result = await async_client.get(
+            url="/api/v1/auth/me",
+            headers={"Authorization": "Bearer claims_token"},
+        )
+        assert result.status_code == status.HTTP_200_OK
+        assert mock_get_principal.call_args.args[3] is None
+
     @pytest.mark.asyncio
     async def test_me_failure_with_refresh_token(
         self,
@@ -42,7 +83,6 @@ class TestMe:
         valid_refresh_token_payload: dict[str, Any],
     ) -> None:
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_refresh_token_payload)
-        mocker.patch("api.api_v1.auth.utils.is_token_revoked", return_value=False)
 
         result = await async_client.get(
             url="/api/v1/auth/me",
@@ -51,6 +91,21 @@ class TestMe:
         assert result.status_code == status.HTTP_401_UNAUTHORIZED
         assert result.json()["detail"] == "Invalid token type: 'refresh', expected 'access'"
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("header", [{"alg": ["RS256"]}, {"alg": "RS256", "kid": {"x": 1}}])
+    async def test_me_failure_with_crafted_header(
+        self,
+        async_client: AsyncClient,
+        header: dict[str, Any],
+    ) -> None:
+        # Заголовок недоверенный: значения не той формы дают 401, а не 500
+        result = await async_client.get(
+            url="/api/v1/auth/me",
+            headers={"Authorization": f"Bearer {crafted_token(header)}"},
+        )
+        assert result.status_code == status.HTTP_401_UNAUTHORIZED
+        assert result.json()["detail"] == "Invalid Token"
+
     @pytest.mark.asyncio
     async def test_me_failure_with_wrong_token(
         self,
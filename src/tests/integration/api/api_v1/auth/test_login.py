@@ -3,9 +3,10 @@ from fastapi import HTTPException, status
 from httpx import AsyncClient
 from pytest_mock import MockerFixture
 
-from api.api_v1.auth.utils import RATE_LIMIT_DATA
+from api.api_v1.auth.utils import LOGIN_FAILURES, RATE_LIMIT_DATA
 from core.models import User
 from core.schemas.auth import TokenInfo
+from core.settings import settings
 
 
 class TestLogin:
@@ -19,9 +20,9 @@ class TestLogin:
         refresh_token: str,
     ):
         RATE_LIMIT_DATA.clear()
+        LOGIN_FAILURES.clear()
         mocker.patch("api.api_v1.auth.auth.get_auth_user", return_value=mock_user)
-        mocker.patch("api.api_v1.auth.auth.get_access_token", return_value=access_token)
-        mocker.patch("api.api_v1.auth.auth.get_refresh_token", return_value=refresh_token)
+        mocker.patch("api.api_v1.auth.auth.get_token_pair", return_value=(access_token, refresh_token))
 
         form_data = {
             "username": "test_user",
@@ -45,6 +46,7 @@ class TestLogin:
         async_client: AsyncClient,
     ):
         RATE_LIMIT_DATA.clear()
+        LOGIN_FAILURES.clear()
         mocker.patch(
             "api.api_v1.auth.auth.get_auth_user",
             side_effect=HTTPException(
@@ -74,9 +76,9 @@ class TestLogin:
         refresh_token: str,
     ):
         RATE_LIMIT_DATA.clear()
+        LOGIN_FAILURES.clear()
         mocker.patch("api.api_v1.auth.auth.get_auth_user", return_value=mock_user)
-        mocker.patch("api.api_v1.auth.auth.get_access_token", return_value=access_token)
-        mocker.patch("api.api_v1.auth.auth.get_refresh_token", return_value=refresh_token)
+        mocker.patch("api.api_v1.auth.auth.get_token_pair", return_value=(access_token, refresh_token))
 
         form_data = {
             "username": "test_user",
@@ -94,3 +96,39 @@ class TestLogin:
         )
         assert result.status_code == status.HTTP_429_TOO_MANY_REQUESTS
         assert result.json()["detail"] == "Too many requests. Try again later."
+
+    @pytest.mark.asyncio
+    async def test_login_with_failure_backoff(
+        self,
+        mocker: MockerFixture,
+        async_client: AsyncClient,
+    ) -> None:
+        RATE_LIMIT_DATA.clear()
+        LOGIN_FAILURES.clear()
+        mocker.patch.object(settings.login_backoff, "user_free_attempts", 0)
+        get_auth_user = mocker.patch(
+            "api.api_v1.auth.auth.get_auth_user",
+            side_effect=HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid username or password",
+            ),
+        )
+
+        form_data = {
+            "username": "test_user",
+            "password": "wrong_pass",
+        }
+        result = await async_client.post(
+            url="/api/v1/auth/login",
+            data=form_data,
+        )
+        assert result.status_code == status.HTTP_401_UNAUTHORIZED
+
+        result = await async_client.post(
+            url="/api/v1/auth/login",
+            data=form_data,
+        )
+        assert result.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert result.json()["detail"] == "Too many failed login attempts. Try again later."
+        assert int(result.headers["Retry-After"]) >= 1
+        assert get_auth_user.call_count == 1
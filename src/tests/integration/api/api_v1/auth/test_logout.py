@@ -14,8 +14,8 @@ class TestLogout:
         async_client: AsyncClient,
         valid_access_token_payload: dict[str, Any],
         access_token: str,
+        mock_get_principal: Any,
     ) -> None:
-        mocker.patch("api.api_v1.auth.auth.get_user_id", return_value=1)
         mocker.patch("api.api_v1.auth.auth.revoke_token", return_value=None)
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
 
@@ -34,8 +34,8 @@ class TestLogout:
         mocker: MockerFixture,
         async_client: AsyncClient,
         valid_access_token_payload: dict[str, Any],
+        mock_get_principal: Any,
     ) -> None:
-        mocker.patch("api.api_v1.auth.auth.get_user_id", return_value=1)
         mocker.patch("api.api_v1.auth.auth.revoke_all_user_tokens", return_value=None)
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
 
@@ -18,9 +18,8 @@ class TestRefresh:
         mock_user: User,
         valid_refresh_token_payload: dict[str, Any],
         access_token: str,
+        mock_get_principal: Any,
     ) -> None:
-        mocker.patch("api.api_v1.auth.auth.get_user_id", return_value=1)
-        mocker.patch("api.api_v1.auth.auth.get_user_by_id", return_value=mock_user)
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_refresh_token_payload)
         mocker.patch("api.api_v1.auth.auth.get_access_token", return_value=access_token)
 
@@ -43,7 +42,6 @@ class TestRefresh:
         valid_access_token_payload: dict[str, Any],
     ) -> None:
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
-        mocker.patch("api.api_v1.auth.utils.is_token_revoked", return_value=False)
 
         result = await async_client.post(
             "/api/v1/auth/refresh",
@@ -0,0 +1,57 @@
+import json
+from typing import Any, AsyncGenerator, AsyncIterator
+
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+from pytest_mock import MockerFixture
+
+from core.schemas.users import UserProfile
+from crud.auth import Principal
+from main import main_app
+from tests.integration.api.api_v1.auth.mock_data import SUPERUSER, USER
+
+
+@pytest.fixture
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    transport = ASGITransport(app=main_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def stream_users(session_factory: Any, fields: list[str], chunk_size: int) -> AsyncIterator[dict[str, Any]]:
+    for user in (USER, SUPERUSER):
+        yield {field: user[field] for field in fields}
+
+
+class TestExportUsers:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("compressed", [False, True])
+    async def test_export_ndjson(self, mocker: MockerFixture, async_client: AsyncClient, compressed: bool) -> None:
+        principal = Principal(UserProfile.model_validate(SUPERUSER), {"type": "access", "sub": "2"})
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value={"type": "access", "sub": "2", "jti": "export"})
+        mocker.patch("api.api_v1.auth.utils.get_principal", return_value=principal)
+        mocker.patch("crud.users.stream_users", side_effect=stream_users)
+
+        result = await async_client.get(
+            url="/api/v1/users/export",
+            headers={"Authorization": "Bearer access_token"},
+            params={"format": "ndjson", "gzip": str(compressed).lower()},
+        )
+        assert result.status_code == status.HTTP_200_OK
+        assert result.headers["content-type"] == "application/x-ndjson"
+        # httpx сам распаковывает тело по Content-Encoding
+        assert result.headers.get("content-encoding") == ("gzip" if compressed else None)
+        assert [json.loads(line)["nickname"] for line in result.text.splitlines()] == ["test_user", "super_user"]
+
+    @pytest.mark.asyncio
+    async def test_export_forbidden_for_regular_user(self, mocker: MockerFixture, async_client: AsyncClient) -> None:
+        principal = Principal(UserProfile.model_validate(USER), {"type": "access", "sub": "1"})
+        mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value={"type": "access", "sub": "1", "jti": "export"})
+        mocker.patch("api.api_v1.auth.utils.get_principal", return_value=principal)
+
+        result = await async_client.get(
+            url="/api/v1/users/export",
+            headers={"Authorization": "Bearer access_token"},
+        )
+        assert result.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,38 @@
+from typing import AsyncGenerator
+
+import jwt
+import pytest
+from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from core.utils.jwt_signer import jwt_signer
+from main import main_app
+
+
+@pytest.fixture
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    transport = ASGITransport(app=main_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+class TestJWKS:
+    @pytest.mark.asyncio
+    async def test_jwks(self, async_client: AsyncClient) -> None:
+        result = await async_client.get("/.well-known/jwks.json")
+        assert result.status_code == status.HTTP_200_OK
+        assert result.headers["cache-control"].startswith("public, max-age=")
+        keys = result.json()["keys"]
+        assert [key["kid"] for key in keys] == [jwt_signer.kid]
+
+        token = jwt_signer.encode({"sub": "1"})
+        public_key = jwt.PyJWKSet.from_dict(result.json())[jwt.get_unverified_header(token)["kid"]]
+        assert jwt.decode(token, public_key, algorithms=[keys[0]["alg"]])["sub"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_jwks_not_modified(self, async_client: AsyncClient) -> None:
+        etag = (await async_client.get("/.well-known/jwks.json")).headers["etag"]
+        result = await async_client.get("/.well-known/jwks.json", headers={"If-None-Match": etag})
+        assert result.status_code == status.HTTP_304_NOT_MODIFIED
+        assert result.content == b""
+        assert result.headers["etag"] == etag
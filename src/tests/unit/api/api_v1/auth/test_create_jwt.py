@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import pytest
@@ -6,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.api_v1.auth.utils import create_jwt
 from core.schemas.auth import TokenType
+from core.settings import settings
 
 
 class TestCreateJWT:
@@ -27,3 +29,45 @@ class TestCreateJWT:
         )
         assert isinstance(result, str)
         assert len(result.split(".")) == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("token_type", "persisted"),
+        [("access", False), ("refresh", True)],
+    )
+    async def test_create_jwt_without_access_records(
+        self,
+        token_type: TokenType,
+        persisted: bool,
+        mocker: MockerFixture,
+        session: AsyncSession,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        mocker.patch.object(settings.auth_jwt, "persist_access_tokens", False)
+        create_jwt_record = mocker.patch("api.api_v1.auth.utils.create_jwt_record", return_value=None)
+        result: str = await create_jwt(
+            session=session,
+            token_type=token_type,
+            token_payload=valid_access_token_payload,
+            expires=5,
+            jti="family-jti",
+        )
+        assert len(result.split(".")) == 3
+        assert create_jwt_record.called is persisted
+
+    @pytest.mark.asyncio
+    async def test_create_jwt_records_expiration(
+        self,
+        mocker: MockerFixture,
+        session: AsyncSession,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        create_jwt_record = mocker.patch("api.api_v1.auth.utils.create_jwt_record", return_value=None)
+        await create_jwt(
+            session=session,
+            token_type="refresh",
+            token_payload=valid_access_token_payload,
+            expires=5,
+        )
+        expires_at = create_jwt_record.call_args.kwargs["expires_at"]
+        assert expires_at - datetime.now(timezone.utc) == pytest.approx(timedelta(minutes=5), abs=timedelta(seconds=5))
@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 import pytest
@@ -5,20 +6,41 @@ from fastapi import HTTPException, status
 from pytest_mock import MockerFixture
 
 from api.api_v1.auth.utils import get_current_token_payload
+from crud.auth import VERIFIED_TOKENS_CACHE
 
 
 class TestGetCurrentTokenPayload:
-    def test_get_current_token_payload_valid(
+    @pytest.mark.asyncio
+    async def test_get_current_token_payload_valid(
         self,
         mocker: MockerFixture,
         valid_access_token_payload: dict[str, Any],
     ) -> None:
         mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=valid_access_token_payload)
-        result = get_current_token_payload(token="Valid_JWT")  # noqa: S106
+        result = await get_current_token_payload(token="Valid_JWT")  # noqa: S106
         assert result == valid_access_token_payload
 
-    def test_get_current_token_payload_invalid(self) -> None:
+    @pytest.mark.asyncio
+    async def test_get_current_token_payload_invalid(self) -> None:
         with pytest.raises(HTTPException) as exc:
-            get_current_token_payload(token="Invalid_JWT")  # noqa: S106
+            await get_current_token_payload(token="Invalid_JWT")  # noqa: S106
         assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
         assert exc.value.detail == "Invalid Token"
+
+    @pytest.mark.asyncio
+    async def test_verified_token_served_from_cache(
+        self,
+        mocker: MockerFixture,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        payload = {**valid_access_token_payload, "jti": "cached-jti", "exp": int(time.time()) + 60}
+        decode_jwt = mocker.patch("api.api_v1.auth.utils.decode_jwt", return_value=payload)
+        VERIFIED_TOKENS_CACHE.clear()
+
+        assert await get_current_token_payload(token="Cached_JWT") == payload  # noqa: S106
+        assert await get_current_token_payload(token="Cached_JWT") == payload  # noqa: S106
+        assert decode_jwt.call_count == 1
+
+        VERIFIED_TOKENS_CACHE.invalidate(payload["jti"])
+        await get_current_token_payload(token="Cached_JWT")  # noqa: S106
+        assert decode_jwt.call_count == 2
@@ -4,7 +4,7 @@ import pytest
 from pytest_mock import MockerFixture
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.api_v1.auth.utils import get_access_token, get_refresh_token
+from api.api_v1.auth.utils import get_access_token, get_refresh_token, get_token_pair
 
 
 class TestGetJWT:
@@ -37,3 +37,27 @@ class TestGetJWT:
             valid_refresh_token_payload,
         )
         assert result == "mock.refresh.jwt"
+
+    @pytest.mark.asyncio
+    async def test_get_token_pair(
+        self,
+        mocker: MockerFixture,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        session = mocker.AsyncMock()
+        session.add = mocker.Mock()
+        create_jwt = mocker.patch(
+            "api.api_v1.auth.utils.create_jwt", side_effect=["mock.access.jwt", "mock.refresh.jwt"]
+        )
+
+        result = await get_token_pair(
+            session,
+            valid_access_token_payload,
+        )
+        assert result == ("mock.access.jwt", "mock.refresh.jwt")
+        access_call, refresh_call = create_jwt.call_args_list
+        assert access_call.kwargs["commit"] is False
+        assert refresh_call.kwargs["commit"] is False
+        assert access_call.kwargs["token_payload"]["fid"] == refresh_call.kwargs["jti"]
+        assert refresh_call.kwargs["token_payload"] == {"sub": valid_access_token_payload["sub"]}
+        session.commit.assert_awaited_once()
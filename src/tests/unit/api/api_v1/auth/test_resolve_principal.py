@@ -0,0 +1,75 @@
+from typing import Any
+
+import pytest
+from fastapi import HTTPException, Request
+from pytest_mock import MockerFixture
+from starlette import status
+
+from api.api_v1.auth.utils import resolve_principal
+from core.schemas.users import UserProfile
+from crud.auth import Principal
+from tests.integration.api.api_v1.auth.mock_data import USER
+
+
+class TestResolvePrincipal:
+    @pytest.mark.asyncio
+    async def test_resolved_once_per_request(
+        self,
+        mocker: MockerFixture,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        principal = Principal(UserProfile.model_validate(USER), valid_access_token_payload)
+        get_principal = mocker.patch("api.api_v1.auth.utils.get_principal", return_value=principal)
+        request = Request(scope={"type": "http", "state": {}})
+
+        assert await resolve_principal(request, mocker.AsyncMock(), valid_access_token_payload, "access") is principal
+        assert await resolve_principal(request, mocker.AsyncMock(), valid_access_token_payload, "access") is principal
+        assert request.state.principal is principal
+        get_principal.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_wrong_token_type(
+        self,
+        mocker: MockerFixture,
+        valid_access_token_payload: dict[str, Any],
+    ) -> None:
+        get_principal = mocker.patch("api.api_v1.auth.utils.get_principal")
+        request = Request(scope={"type": "http", "state": {}})
+
+        with pytest.raises(HTTPException) as exc:
+            await resolve_principal(request, mocker.AsyncMock(), valid_access_token_payload, "refresh")
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        get_principal.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("payload", [None, "WrongType"])
+    async def test_invalid_payload(self, mocker: MockerFixture, payload: Any) -> None:
+        get_principal = mocker.patch("api.api_v1.auth.utils.get_principal")
+        request = Request(scope={"type": "http", "state": {}})
+
+        with pytest.raises(HTTPException) as exc:
+            await resolve_principal(request, mocker.AsyncMock(), payload, "access")
+        assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+        assert exc.value.detail == "No token_payload provided or wrong token_payload type"
+        get_principal.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("subject", [None, "", "abc", 1, ["1"]])
+    async def test_missing_or_malformed_sub(
+        self,
+        mocker: MockerFixture,
+        valid_access_token_payload: dict[str, Any],
+        subject: Any,
+    ) -> None:
+        get_principal = mocker.patch("api.api_v1.auth.utils.get_principal")
+        request = Request(scope={"type": "http", "state": {}})
+        if subject is None:
+            del valid_access_token_payload["sub"]
+        else:
+            valid_access_token_payload["sub"] = subject
+
+        with pytest.raises(HTTPException) as exc:
+            await resolve_principal(request, mocker.AsyncMock(), valid_access_token_payload, "access")
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        assert exc.value.detail == "Invalid token"
+        get_principal.assert_not_called()
@@ -0,0 +1,66 @@
+from typing import Annotated, AsyncGenerator
+
+import pytest
+from fastapi import Depends, FastAPI, Form, status
+from httpx import ASGITransport, AsyncClient
+
+from api.middleware import RateLimitMiddleware, default_rate_limit_rules
+from core.settings import RateLimitRule, settings
+from core.utils.rate_limit import SlidingWindowRateLimiter
+
+
+@pytest.fixture
+def sessions() -> list[int]:
+    return []
+
+
+@pytest.fixture
+async def async_client(sessions: list[int]) -> AsyncGenerator[AsyncClient, None]:
+    async def get_session() -> AsyncGenerator[int, None]:
+        sessions.append(1)
+        yield len(sessions)
+
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login(session: Annotated[int, Depends(get_session)], username: Annotated[str, Form()]) -> dict[str, str]:
+        return {"username": username}
+
+    @app.post("/logout")
+    async def logout(session: Annotated[int, Depends(get_session)]) -> dict[str, str]:
+        return {"message": "OK"}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=SlidingWindowRateLimiter(),
+        rules={("POST", "/login"): RateLimitRule(max_calls=2, time_frame=60)},
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+class TestRateLimitMiddleware:
+    @pytest.mark.asyncio
+    async def test_rejects_before_dependencies(self, async_client: AsyncClient, sessions: list[int]) -> None:
+        for _ in range(2):
+            result = await async_client.post("/login", data={"username": "user"})
+            assert result.status_code == status.HTTP_200_OK
+
+        result = await async_client.post("/login", data={"username": "user"})
+        assert result.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert result.json()["detail"] == "Too many requests. Try again later."
+        assert 0 < int(result.headers["Retry-After"]) <= 120
+        assert len(sessions) == 2
+
+    @pytest.mark.asyncio
+    async def test_other_routes_are_not_limited(self, async_client: AsyncClient, sessions: list[int]) -> None:
+        for _ in range(5):
+            result = await async_client.post("/logout")
+            assert result.status_code == status.HTTP_200_OK
+        assert len(sessions) == 5
+
+    def test_default_rules(self) -> None:
+        rules = default_rate_limit_rules()
+        assert rules[("POST", "/api/v1/auth/login")] == settings.rate_limit.login
+        assert ("POST", "/api/v1/auth/refresh") in rules
+        assert ("POST", "/api/v1/users/register") in rules
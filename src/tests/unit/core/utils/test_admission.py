@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from core.utils.admission import AdmissionLimiter, AdmissionRejectedError
+
+
+class TestAdmissionLimiter:
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self) -> None:
+        limiter = AdmissionLimiter(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with limiter.slot():
+                await release.wait()
+
+        running = asyncio.create_task(hold())
+        queued = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        assert limiter.stats()["in_flight"] == 1
+        assert limiter.stats()["queue_depth"] == 1
+
+        with pytest.raises(AdmissionRejectedError) as exc:
+            async with limiter.slot():
+                pass  # pragma: no cover
+        assert exc.value.retry_after >= 1
+        assert limiter.stats()["rejected_total"] == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert limiter.stats()["admitted_total"] == 2
+        assert limiter.stats()["in_flight"] == 0
+        assert limiter.stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_admits_within_concurrency(self) -> None:
+        limiter = AdmissionLimiter(max_concurrency=2, max_queue=0)
+        async with limiter.slot():
+            async with limiter.slot():
+                assert limiter.stats()["in_flight"] == 2
+        assert limiter.stats()["rejected_total"] == 0
@@ -0,0 +1,39 @@
+from pytest_mock import MockerFixture
+
+from core.utils.backoff import FailureBackoff
+
+
+class TestFailureBackoff:
+    def test_free_attempts_are_not_blocked(self) -> None:
+        backoff = FailureBackoff()
+        for _ in range(3):
+            backoff.record_failure("user:test", free_attempts=3)
+        assert backoff.retry_after("user:test") == 0
+
+    def test_delay_grows_exponentially(self, mocker: MockerFixture) -> None:
+        mocker.patch("core.utils.backoff.time.monotonic", return_value=1000.0)
+        backoff = FailureBackoff(base_delay=1.0, max_delay=10.0)
+        delays = []
+        for _ in range(6):
+            backoff.record_failure("ip:127.0.0.1", free_attempts=1)
+            delays.append(backoff.retry_after("ip:127.0.0.1"))
+        assert delays == [0, 1, 2, 4, 8, 10]
+
+    def test_reset(self) -> None:
+        backoff = FailureBackoff()
+        backoff.record_failure("user:test", free_attempts=0)
+        assert backoff.retry_after("user:test") > 0
+        backoff.reset("user:test")
+        assert backoff.retry_after("user:test") == 0
+
+    def test_stale_and_excess_entries_are_evicted(self, mocker: MockerFixture) -> None:
+        clock = mocker.patch("core.utils.backoff.time.monotonic", return_value=0.0)
+        backoff = FailureBackoff(max_delay=10.0, forget_after=60.0, max_entries=2)
+        backoff.record_failure("a", free_attempts=5)
+        backoff.record_failure("b", free_attempts=5)
+        backoff.record_failure("c", free_attempts=5)
+        assert len(backoff) == 2
+
+        clock.return_value = 120.0
+        backoff.record_failure("d", free_attempts=5)
+        assert len(backoff) == 1
@@ -0,0 +1,27 @@
+import uuid
+
+from core.utils.bloom import BloomFilter
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [str(uuid.uuid4()) for _ in range(1000)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for _ in range(1000):
+            bloom.add(str(uuid.uuid4()))
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+        assert false_positives < 300
+
+    def test_stats(self) -> None:
+        bloom = BloomFilter(capacity=1000, error_rate=0.001)
+        stats = bloom.stats()
+        assert stats["hash_count"] == 10
+        assert stats["memory_bytes"] == (stats["size_bits"] + 7) // 8
+        assert stats["estimated_error_rate"] == 0
@@ -0,0 +1,48 @@
+from pytest_mock import MockerFixture
+
+from core.utils.cache import ExpiringLRUCache
+
+
+class TestExpiringLRUCache:
+    def test_get_and_expiry(self, mocker: MockerFixture) -> None:
+        clock = mocker.Mock(return_value=100.0)
+        cache: ExpiringLRUCache[str, bool] = ExpiringLRUCache(maxsize=10, clock=clock)
+        cache.set("jti", True, expires_at=110.0)
+        assert "jti" in cache
+
+        clock.return_value = 110.0
+        assert "jti" not in cache
+        assert len(cache) == 0
+        assert cache.stats()["expirations"] == 1
+
+    def test_already_expired_is_not_stored(self, mocker: MockerFixture) -> None:
+        cache: ExpiringLRUCache[str, bool] = ExpiringLRUCache(maxsize=10, clock=mocker.Mock(return_value=100.0))
+        cache.set("jti", True, expires_at=50.0)
+        assert len(cache) == 0
+
+    def test_expired_entries_are_evicted_on_set(self, mocker: MockerFixture) -> None:
+        clock = mocker.Mock(return_value=100.0)
+        cache: ExpiringLRUCache[str, bool] = ExpiringLRUCache(maxsize=10, clock=clock)
+        for i in range(5):
+            cache.set(f"old-{i}", True, expires_at=105.0)
+        clock.return_value = 200.0
+        cache.set("new", True, expires_at=300.0)
+        assert len(cache) == 1
+
+    def test_lru_eviction(self, mocker: MockerFixture) -> None:
+        cache: ExpiringLRUCache[str, int] = ExpiringLRUCache(maxsize=2, clock=mocker.Mock(return_value=0.0))
+        cache.set("a", 1, expires_at=100.0)
+        cache.set("b", 2, expires_at=100.0)
+        assert cache.get("a") == 1
+        cache.set("c", 3, expires_at=100.0)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_hit_rate(self, mocker: MockerFixture) -> None:
+        cache: ExpiringLRUCache[str, int] = ExpiringLRUCache(maxsize=2, clock=mocker.Mock(return_value=0.0))
+        cache.set("a", 1, expires_at=100.0)
+        cache.get("a")
+        cache.get("missing")
+        assert cache.stats()["hit_rate"] == 0.5
@@ -0,0 +1,48 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from core.utils.event_log import SharedEventLog
+
+
+class TestSharedEventLog:
+    @pytest.mark.asyncio
+    async def test_events_reach_other_workers(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "shared.sqlite3")
+        worker_a = SharedEventLog(path, poll_interval=60)
+        worker_b = SharedEventLog(path, poll_interval=60)
+        received_a: list[tuple[str, float]] = []
+        received_b: list[tuple[str, float]] = []
+        worker_a.subscribe("revocation", lambda key, value: received_a.append((key, value)))
+        worker_b.subscribe("revocation", lambda key, value: received_b.append((key, value)))
+        await worker_a.start()
+        await worker_b.start()
+        try:
+            expires_at = time.time() + 60
+            await worker_a.publish("revocation", "jti-1", expires_at, expires_at)
+            await worker_a.publish("other", "key", 1.0, expires_at)
+
+            assert await worker_b.poll() == 2
+            assert received_b == [("jti-1", expires_at)]
+            assert await worker_a.poll() == 0
+            assert received_a == []
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+
+    @pytest.mark.asyncio
+    async def test_replays_live_events_on_start(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "shared.sqlite3")
+        writer = SharedEventLog(path, poll_interval=60)
+        await writer.start()
+        await writer.publish("revocation", "expired", 0.0, time.time() - 1)
+        await writer.publish("revocation", "live", 0.0, time.time() + 60)
+        await writer.stop()
+
+        received: list[str] = []
+        reader = SharedEventLog(path, poll_interval=60)
+        reader.subscribe("revocation", lambda key, value: received.append(key))
+        await reader.start()
+        await reader.stop()
+        assert received == ["live"]
@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator
+
+import pytest
+
+from core.utils.export import encode_rows, gzip_chunks
+
+ROWS: list[dict[str, Any]] = [{"id": user_id, "nickname": f"user_{user_id}", "email": None} for user_id in range(1, 6)]
+FIELDS = ["id", "nickname", "email"]
+
+
+async def aiter_rows(rows: list[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    for row in rows:
+        yield row
+
+
+async def collect(chunks: AsyncIterator[bytes]) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+class TestExport:
+    @pytest.mark.asyncio
+    async def test_ndjson_in_chunks(self) -> None:
+        chunks = await collect(encode_rows(aiter_rows(ROWS), FIELDS, "ndjson", chunk_size=2))
+        assert len(chunks) == 3
+        assert [json.loads(line) for line in b"".join(chunks).splitlines()] == ROWS
+
+    @pytest.mark.asyncio
+    async def test_csv_header_once(self) -> None:
+        chunks = await collect(encode_rows(aiter_rows(ROWS), FIELDS, "csv", chunk_size=2))
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert [row["nickname"] for row in rows] == [row["nickname"] for row in ROWS]
+        assert chunks[0].startswith(b"id,nickname,email\n")
+
+    @pytest.mark.asyncio
+    async def test_csv_formulas_escaped(self) -> None:
+        rows: list[dict[str, Any]] = [
+            {"id": 1, "nickname": '=HYPERLINK("http://evil")', "email": "@sum"},
+            {**ROWS[0], "id": -1},
+        ]
+        chunks = await collect(encode_rows(aiter_rows(rows), FIELDS, "csv", chunk_size=2))
+        parsed = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert parsed[0] == {"id": "1", "nickname": '\'=HYPERLINK("http://evil")', "email": "'@sum"}
+        # Экранируются только строки: отрицательное число остаётся числом
+        assert parsed[1]["id"] == "-1"
+
+    @pytest.mark.asyncio
+    async def test_empty_csv_has_header(self) -> None:
+        assert await collect(encode_rows(aiter_rows([]), FIELDS, "csv", chunk_size=2)) == [b"id,nickname,email\n"]
+
+    @pytest.mark.asyncio
+    async def test_gzip_chunks(self) -> None:
+        chunks = await collect(gzip_chunks(encode_rows(aiter_rows(ROWS), FIELDS, "ndjson", chunk_size=2)))
+        plain = b"".join(await collect(encode_rows(aiter_rows(ROWS), FIELDS, "ndjson", chunk_size=2)))
+        assert gzip.decompress(b"".join(chunks)) == plain
+        # Каждая пачка сбрасывается сразу и распаковывается без остальных
+        first_chunk = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(chunks[0])
+        assert first_chunk == b"".join(plain.splitlines(keepends=True)[:2])
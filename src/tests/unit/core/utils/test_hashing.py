@@ -0,0 +1,61 @@
+import pytest
+from argon2 import PasswordHasher
+
+from core.utils.hashing import MAX_TIME_COST, ExecutorMode, PasswordHashExecutor, calibrate_hasher
+
+
+class TestPasswordHashExecutor:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["thread", "process"])
+    async def test_hash_and_verify(self, mode: ExecutorMode) -> None:
+        executor = PasswordHashExecutor(
+            mode=mode,
+            max_workers=1,
+            hasher=PasswordHasher(time_cost=1, memory_cost=8, parallelism=1),
+        )
+        try:
+            hashed = await executor.hash("password")
+            assert hashed.startswith("$argon2id$")
+            assert await executor.verify(hashed, "password") is True
+            assert await executor.verify(hashed, "wrong_password") is False
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_verify_invalid_hash(self) -> None:
+        executor = PasswordHashExecutor(max_workers=1)
+        try:
+            assert await executor.verify("not_a_hash", "password") is False
+        finally:
+            executor.shutdown()
+
+    def test_check_needs_rehash(self) -> None:
+        weak_hasher = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        executor = PasswordHashExecutor(hasher=PasswordHasher(time_cost=2, memory_cost=16, parallelism=1))
+        assert executor.check_needs_rehash(weak_hasher.hash("password")) is True
+        assert executor.check_needs_rehash(executor.hasher.hash("password")) is False
+
+    def test_stronger_hash_is_kept(self) -> None:
+        # Соседний воркер откалибровался на time_cost выше: такой хеш не перехешируется обратно
+        stronger_hasher = PasswordHasher(time_cost=3, memory_cost=16, parallelism=1)
+        executor = PasswordHashExecutor(hasher=PasswordHasher(time_cost=2, memory_cost=16, parallelism=2))
+        assert executor.check_needs_rehash(stronger_hasher.hash("password")) is False
+        assert executor.check_needs_rehash("not_a_hash") is True
+
+
+class TestCalibrateHasher:
+    def test_calibrate_within_budget(self) -> None:
+        hasher = calibrate_hasher(target_ms=5, max_memory_kib=1024, max_parallelism=1)
+        assert hasher.memory_cost <= 1024
+        assert hasher.parallelism == 1
+        assert 1 <= hasher.time_cost <= MAX_TIME_COST
+
+    @pytest.mark.asyncio
+    async def test_executor_calibrate(self) -> None:
+        executor = PasswordHashExecutor(max_workers=1)
+        try:
+            await executor.calibrate(target_ms=5, max_memory_kib=1024, max_parallelism=1)
+            assert executor.hasher.memory_cost <= 1024
+            assert await executor.verify(await executor.hash("password"), "password") is True
+        finally:
+            executor.shutdown()
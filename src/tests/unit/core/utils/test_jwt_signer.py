@@ -0,0 +1,170 @@
+import base64
+import json
+import time
+from typing import Any
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt import (
+    DecodeError,
+    ExpiredSignatureError,
+    InvalidAlgorithmError,
+    InvalidKeyError,
+    InvalidSignatureError,
+    InvalidTokenError,
+)
+
+from core.utils.jwt_signer import JWTSigner, jwk_thumbprint
+
+
+def crafted_token(header: dict[str, Any]) -> str:
+    segments = [json.dumps(header).encode(), json.dumps({"sub": "1"}).encode(), b"signature"]
+    return ".".join(base64.urlsafe_b64encode(segment).rstrip(b"=").decode() for segment in segments)
+
+
+def pem_keys(private_key: Any) -> tuple[str, str]:
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+# Пример из RFC 7638, раздел 3.1
+RFC_7638_JWK = {
+    "kty": "RSA",
+    "n": (
+        "0vx7agoebGcQSuuPiLJXZptN9nndrQmbXEps2aiAFbWhM78LhWx4cbbfAAtVT86zwu1RK7aPFFxuhDR1L6tSoc_BJECPebWKRXjBZCiFV4n3"
+        "oknjhMstn64tZ_2W-5JsGY4Hc5n9yBXArwl93lqt7_RN5w6Cf0h4QyQ5v-65YGjQR0_FDW2QvzqY368QQMicAtaSqzs8KJZgnYb9c7d0zgdA"
+        "ZHzu6qMQvRL5hajrn1n91CbOpbISD08qNLyrdkt-bFTWhAI4vMQFh6WeZu0fM4lFd2NcRwr3XPksINHaQ-G_xBniIqbw0Ls1jF44-csFCur-"
+        "kEgU8awapJzKnqDKgw"
+    ),
+    "e": "AQAB",
+    "alg": "RS256",
+    "kid": "2011-04-29",
+}
+
+
+@pytest.fixture(scope="module")
+def rsa_pem_keys() -> tuple[str, str]:
+    return pem_keys(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+
+@pytest.fixture(scope="module")
+def signer(rsa_pem_keys: tuple[str, str]) -> JWTSigner:
+    private_pem, public_pem = rsa_pem_keys
+    return JWTSigner(private_pem, public_pem, "RS256")
+
+
+class TestJWTSigner:
+    def test_tokens_compatible_with_pyjwt(self, signer: JWTSigner, rsa_pem_keys: tuple[str, str]) -> None:
+        private_pem, public_pem = rsa_pem_keys
+        payload = {"sub": "1", "exp": int(time.time()) + 60}
+
+        token = signer.encode(payload)
+        assert jwt.decode(token, public_pem, algorithms=["RS256"]) == payload
+        assert signer.decode(jwt.encode(payload, private_pem, "RS256")) == payload
+
+    def test_expired_token(self, signer: JWTSigner) -> None:
+        token = signer.encode({"sub": "1", "exp": int(time.time()) - 1})
+        with pytest.raises(ExpiredSignatureError):
+            signer.decode(token)
+
+    def test_tampered_signature(self, signer: JWTSigner) -> None:
+        token = signer.encode({"sub": "1", "exp": int(time.time()) + 60})
+        other = signer.encode({"sub": "2", "exp": int(time.time()) + 60})
+        forged = token.rsplit(".", 1)[0] + "." + other.rsplit(".", 1)[1]
+        with pytest.raises(InvalidSignatureError):
+            signer.decode(forged)
+
+    def test_rejects_other_algorithm(self, signer: JWTSigner) -> None:
+        token = jwt.encode({"sub": "1"}, "hmac-secret-" + "x" * 32, "HS256")
+        with pytest.raises(InvalidAlgorithmError):
+            signer.decode(token)
+
+    @pytest.mark.parametrize("header", [{"alg": ["RS256"]}, {"alg": None}])
+    def test_rejects_non_string_alg(self, signer: JWTSigner, header: dict[str, Any]) -> None:
+        with pytest.raises(InvalidAlgorithmError):
+            signer.decode(crafted_token(header))
+
+    @pytest.mark.parametrize("kid", [{"x": 1}, ["kid"], 1])
+    def test_rejects_non_string_kid(self, signer: JWTSigner, kid: Any) -> None:
+        with pytest.raises(InvalidTokenError, match="Unknown signing key"):
+            signer.decode(crafted_token({"alg": "RS256", "kid": kid}))
+
+    @pytest.mark.parametrize("token", ["Invalid_JWT", "a.b.c", ""])
+    def test_malformed_token(self, signer: JWTSigner, token: str) -> None:
+        with pytest.raises(DecodeError):
+            signer.decode(token)
+
+    @pytest.mark.parametrize(
+        ("algorithm", "private_key"),
+        [
+            ("ES256", ec.generate_private_key(ec.SECP256R1())),
+            ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+        ],
+    )
+    def test_other_algorithms(self, algorithm: str, private_key: Any) -> None:
+        private_pem, public_pem = pem_keys(private_key)
+        signer = JWTSigner(private_pem, public_pem, algorithm)
+        payload = {"sub": "1", "exp": int(time.time()) + 60}
+
+        token = signer.encode(payload)
+        assert signer.decode(token) == payload
+        assert jwt.decode(token, public_pem, algorithms=[algorithm]) == payload
+
+    @pytest.mark.parametrize(
+        ("algorithm", "private_key"),
+        [
+            ("ES256", ed25519.Ed25519PrivateKey.generate()),
+            ("ES256", ec.generate_private_key(ec.SECP384R1())),
+            ("EdDSA", ec.generate_private_key(ec.SECP256R1())),
+        ],
+    )
+    def test_key_type_must_match_algorithm(self, algorithm: str, private_key: Any) -> None:
+        with pytest.raises(InvalidKeyError):
+            JWTSigner(*pem_keys(private_key), algorithm)
+
+    def test_accepts_previous_key_during_migration(self, signer: JWTSigner, rsa_pem_keys: tuple[str, str]) -> None:
+        private_pem, public_pem = pem_keys(ed25519.Ed25519PrivateKey.generate())
+        migrated = JWTSigner(private_pem, public_pem, "EdDSA", previous_keys=[("RS256", rsa_pem_keys[1])])
+        old_token = signer.encode({"sub": "1", "exp": int(time.time()) + 60})
+
+        assert migrated.decode(old_token)["sub"] == "1"
+        assert migrated.decode(migrated.encode({"sub": "2"}))["sub"] == "2"
+        with pytest.raises(InvalidTokenError):
+            JWTSigner(private_pem, public_pem, "EdDSA").decode(old_token)
+
+    def test_kid_selects_key(self, signer: JWTSigner, rsa_pem_keys: tuple[str, str]) -> None:
+        token = signer.encode({"sub": "1"})
+        assert jwt.get_unverified_header(token)["kid"] == signer.kid
+        assert [jwk["kid"] for jwk in signer.jwks["keys"]] == [signer.kid]
+
+        other_private, other_public = pem_keys(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        rotated = JWTSigner(other_private, other_public, "RS256", previous_keys=[("RS256", rsa_pem_keys[1])])
+        assert rotated.decode(token)["sub"] == "1"
+        assert {jwk["kid"] for jwk in rotated.jwks["keys"]} == {signer.kid, rotated.kid}
+
+    def test_token_without_kid(self, signer: JWTSigner, rsa_pem_keys: tuple[str, str]) -> None:
+        token = jwt.encode({"sub": "1"}, rsa_pem_keys[0], "RS256")
+        assert signer.decode(token)["sub"] == "1"
+
+    def test_mismatched_key_pair(self, rsa_pem_keys: tuple[str, str]) -> None:
+        _, other_public = pem_keys(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        with pytest.raises(InvalidKeyError):
+            JWTSigner(rsa_pem_keys[0], other_public, "RS256")
+
+    def test_jwks_matches_pyjwt_thumbprint(self, signer: JWTSigner) -> None:
+        jwk = jwt.PyJWK(signer.jwks["keys"][0])
+        assert jwk.key_id == signer.kid
+        assert jwk.algorithm_name == "RS256"
+
+    def test_rfc_7638_thumbprint(self) -> None:
+        assert jwk_thumbprint(RFC_7638_JWK) == "NzbLsXh8uDCcd-6MNwXF4W_7noWXFZAfHkxZsRGC9Xs"
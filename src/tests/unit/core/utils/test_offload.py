@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from core.utils.offload import AdaptiveOffloader
+
+
+def current_thread_name() -> str:
+    return threading.current_thread().name
+
+
+class TestAdaptiveOffloader:
+    @pytest.mark.asyncio
+    async def test_disabled_runs_inline(self) -> None:
+        offloader = AdaptiveOffloader(enabled=False, max_workers=2, min_cost_ms=0.0)
+        assert await offloader.run("op", current_thread_name) == threading.current_thread().name
+        assert offloader.stats()["inline_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cheap_operation_stays_inline(self) -> None:
+        offloader = AdaptiveOffloader(enabled=True, max_workers=2, min_cost_ms=1000.0)
+        for _ in range(3):
+            assert await offloader.run("cheap", current_thread_name) == threading.current_thread().name
+        assert offloader.offloaded_total == 0
+
+    @pytest.mark.asyncio
+    async def test_expensive_operation_offloaded(self) -> None:
+        offloader = AdaptiveOffloader(enabled=True, max_workers=2, min_cost_ms=1.0)
+        offloader.costs_ms["sign"] = 5.0
+        try:
+            assert (await offloader.run("sign", current_thread_name)).startswith("offload")
+            assert offloader.offloaded_total == 1
+        finally:
+            offloader.shutdown()
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pytest
+
+from core.utils.rate_limit import SlidingWindowRateLimiter, SQLiteRateLimitStore
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSlidingWindowRateLimiter:
+    def test_limit_within_window(self) -> None:
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(clock=clock)
+
+        assert all(limiter.check("ip", limit=3, window=60).allowed for _ in range(3))
+        result = limiter.check("ip", limit=3, window=60)
+        assert result.allowed is False
+        assert result.retry_after > 0
+        assert limiter.check("other-ip", limit=3, window=60).allowed is True
+
+    def test_previous_window_decays(self) -> None:
+        clock = FakeClock(1200.0)
+        limiter = SlidingWindowRateLimiter(clock=clock)
+        for _ in range(4):
+            assert limiter.check("ip", limit=4, window=60).allowed
+
+        # Половина предыдущего окна ещё учитывается: 4 * 0.5 = 2, можно ещё два запроса
+        clock.now = 1290.0
+        assert limiter.check("ip", limit=4, window=60).allowed
+        assert limiter.check("ip", limit=4, window=60).allowed
+        result = limiter.check("ip", limit=4, window=60)
+        assert result.allowed is False
+
+        clock.now += result.retry_after
+        assert limiter.check("ip", limit=4, window=60).allowed
+
+    def test_idle_keys_evicted(self) -> None:
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(clock=clock)
+        for number in range(100):
+            limiter.check(f"ip-{number}", limit=5, window=60)
+        assert len(limiter) == 100
+
+        clock.now += 180
+        assert limiter.evict_idle() == 100
+        assert len(limiter) == 0
+        assert limiter.stats()["evicted_total"] == 100
+
+    def test_hits_evict_idle_keys(self) -> None:
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(clock=clock, evict_batch=10)
+        for number in range(5):
+            limiter.check(f"ip-{number}", limit=5, window=60)
+
+        clock.now += 180
+        limiter.check("fresh-ip", limit=5, window=60)
+        assert len(limiter) == 1
+
+
+class TestSQLiteRateLimitStore:
+    @pytest.mark.asyncio
+    async def test_limit_shared_between_workers(self, tmp_path: Path) -> None:
+        clock = FakeClock()
+        path = str(tmp_path / "shared.sqlite3")
+        worker_a = SQLiteRateLimitStore(path, clock=clock)
+        worker_b = SQLiteRateLimitStore(path, clock=clock)
+        try:
+            assert (await worker_a.hit("ip", limit=3, window=60)).allowed
+            assert (await worker_b.hit("ip", limit=3, window=60)).allowed
+            assert (await worker_a.hit("ip", limit=3, window=60)).allowed
+            result = await worker_b.hit("ip", limit=3, window=60)
+            assert result.allowed is False
+            assert result.retry_after > 0
+
+            clock.now += 120
+            assert (await worker_b.hit("ip", limit=3, window=60)).allowed
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+    def test_idle_keys_purged(self, tmp_path: Path) -> None:
+        clock = FakeClock()
+        store = SQLiteRateLimitStore(str(tmp_path / "shared.sqlite3"), clock=clock, purge_every=5)
+        try:
+            for number in range(4):
+                store.check(f"ip-{number}", limit=5, window=60)
+            clock.now += 180
+            store.check("fresh-ip", limit=5, window=60)
+            assert store.stats()["evicted_total"] == 4
+
+            store.clear()
+            assert store.check("fresh-ip", limit=1, window=60).allowed
+        finally:
+            store.close()
@@ -0,0 +1,67 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from core.utils.cache import ExpiringLRUCache
+from core.utils.event_log import SharedEventLog
+from core.utils.revocation_store import InMemoryRevocationStore, SharedRevocationStore
+
+
+class TestRevocationStore:
+    @pytest.mark.asyncio
+    async def test_in_memory_store(self) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=60)
+        revoked: list[str] = []
+        store.subscribe(revoked.append)
+
+        await store.revoke("jti-1", time.time() + 60)
+        assert store.is_revoked("jti-1") is True
+        assert store.is_revoked("jti-2") is False
+        assert revoked == ["jti-1"]
+
+    @pytest.mark.asyncio
+    async def test_user_cutoff(self) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=60)
+        now = time.time()
+        await store.revoke_user(1, now)
+
+        assert store.issued_before_cutoff(1, now - 5) is True
+        assert store.issued_before_cutoff(1, int(now)) is False
+        assert store.issued_before_cutoff(2, now - 5) is False
+
+    def test_expired_user_cutoffs_are_dropped(self) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=60)
+        store.remember_user_cutoff(1, time.time() - 120)
+        assert store.user_cutoffs == {}
+
+        store.user_cutoffs[2] = time.time() - 120
+        store.user_cutoffs[3] = time.time()
+        assert store.purge_user_cutoffs() == 1
+        assert list(store.user_cutoffs) == [3]
+
+    @pytest.mark.asyncio
+    async def test_shared_store_propagates_between_workers(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "shared.sqlite3")
+        worker_a = SharedRevocationStore(ExpiringLRUCache(maxsize=10), 60, SharedEventLog(path, poll_interval=60))
+        worker_b = SharedRevocationStore(ExpiringLRUCache(maxsize=10), 60, SharedEventLog(path, poll_interval=60))
+        revoked_on_b: list[str] = []
+        worker_b.subscribe(revoked_on_b.append)
+        await worker_a.start()
+        await worker_b.start()
+        try:
+            await worker_a.revoke("jti-1", time.time() + 60)
+            assert worker_a.is_revoked("jti-1") is True
+            assert worker_b.is_revoked("jti-1") is False
+
+            await worker_b.event_log.poll()
+            assert worker_b.is_revoked("jti-1") is True
+            assert revoked_on_b == ["jti-1"]
+
+            cutoff = time.time()
+            await worker_a.revoke_user(7, cutoff)
+            await worker_b.event_log.poll()
+            assert worker_b.user_cutoffs == {7: cutoff}
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
@@ -0,0 +1,41 @@
+import time
+
+from core.utils.token_cache import VerifiedTokenCache
+
+
+class TestVerifiedTokenCache:
+    def test_get_and_set(self) -> None:
+        cache = VerifiedTokenCache(maxsize=10)
+        payload = {"sub": "1", "jti": "jti-1", "exp": time.time() + 60}
+        cache.set("token-1", payload)
+
+        assert cache.get("token-1") == payload
+        assert cache.get("token-2") is None
+
+    def test_entry_lives_until_exp(self) -> None:
+        cache = VerifiedTokenCache(maxsize=10)
+        cache.set("expired", {"jti": "jti-1", "exp": time.time() - 1})
+        cache.set("no-exp", {"jti": "jti-2"})
+
+        assert cache.get("expired") is None
+        assert cache.get("no-exp") is None
+
+    def test_invalidate_by_jti_and_family(self) -> None:
+        cache = VerifiedTokenCache(maxsize=10)
+        exp = time.time() + 60
+        cache.set("access-1", {"jti": "access-jti-1", "fid": "family", "exp": exp})
+        cache.set("access-2", {"jti": "access-jti-2", "fid": "family", "exp": exp})
+        cache.set("access-3", {"jti": "access-jti-3", "exp": exp})
+
+        cache.invalidate("access-jti-3")
+        assert cache.get("access-3") is None
+        cache.invalidate("family")
+        assert cache.get("access-1") is None
+        assert cache.get("access-2") is None
+
+    def test_index_stays_bounded(self) -> None:
+        cache = VerifiedTokenCache(maxsize=2)
+        for number in range(20):
+            cache.set(f"token-{number}", {"jti": f"jti-{number}", "exp": time.time() + 60})
+        assert len(cache.tokens) == 2
+        assert len(cache._by_jti) <= 4
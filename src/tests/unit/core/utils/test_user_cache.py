@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import and_, or_
+
+from core.models import User
+from core.utils.event_log import SharedEventLog
+from core.utils.user_cache import UserSnapshotCache, ids_in_criteria
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestUserSnapshotCache:
+    def test_snapshot_expires_after_ttl(self) -> None:
+        clock = FakeClock()
+        cache: UserSnapshotCache[str] = UserSnapshotCache(maxsize=10, ttl=60, clock=clock)
+        cache.set(1, "user", cache.generation)
+        assert cache.get(1) == "user"
+
+        clock.now += 61
+        assert cache.get(1) is None
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_snapshot_read_before_invalidation_is_dropped(self) -> None:
+        cache: UserSnapshotCache[str] = UserSnapshotCache(maxsize=10, ttl=60)
+        generation = cache.generation
+        cache.invalidate([1])
+        cache.set(1, "stale", generation)
+        assert cache.get(1) is None
+        assert cache.stats()["stale_skips"] == 1
+
+    def test_invalidate_all(self) -> None:
+        cache: UserSnapshotCache[str] = UserSnapshotCache(maxsize=10, ttl=60)
+        cache.set(1, "first", cache.generation)
+        cache.set(2, "second", cache.generation)
+        cache.invalidate()
+        assert len(cache.snapshots) == 0
+
+    def test_changed_since(self) -> None:
+        clock = FakeClock()
+        cache: UserSnapshotCache[str] = UserSnapshotCache(maxsize=10, ttl=60, change_ttl=900, clock=clock)
+        # До старта процесса изменения неизвестны
+        assert cache.changed_since(1, 999) is True
+        assert cache.changed_since(1, 1001) is False
+
+        clock.now = 1010.5
+        cache.invalidate([1])
+        assert cache.changed_since(1, 1010) is True
+        assert cache.changed_since(1, 1011) is False
+        assert cache.changed_since(2, 1005) is False
+
+        clock.now = 1020.0
+        cache.invalidate()
+        assert cache.changed_since(2, 1015) is True
+
+    def test_changes_are_bounded(self) -> None:
+        clock = FakeClock()
+        cache: UserSnapshotCache[str] = UserSnapshotCache(10, 60, change_ttl=900, max_changes=2, clock=clock)
+        clock.now = 1100.0
+        cache.invalidate([1, 2, 3])
+        assert cache.changed_at == {}
+        assert cache.changed_since(4, 1050) is True
+
+    def test_ids_in_criteria(self) -> None:
+        column = User.__table__.c.id
+        assert ids_in_criteria(User.id == 3, column) == {3}
+        assert ids_in_criteria(and_(User.id == 3, User.password == "old"), column) == {3}
+        assert ids_in_criteria(User.id.in_([1, 2]), column) == {1, 2}
+        assert ids_in_criteria(or_(User.id == 3, User.nickname == "user"), column) is None
+        assert ids_in_criteria(User.is_active.is_(False), column) is None
+        assert ids_in_criteria(None, column) is None
+
+    @pytest.mark.asyncio
+    async def test_shared_invalidation_between_workers(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "shared.sqlite3")
+        worker_a: UserSnapshotCache[str] = UserSnapshotCache(10, 60, SharedEventLog(path, poll_interval=60))
+        worker_b: UserSnapshotCache[str] = UserSnapshotCache(10, 60, SharedEventLog(path, poll_interval=60))
+        await worker_a.start()
+        await worker_b.start()
+        try:
+            worker_b.set(7, "user", worker_b.generation)
+            worker_a.invalidate([7])
+            await worker_a.stop()
+            assert worker_b.get(7) == "user"
+
+            assert worker_b.event_log is not None
+            await worker_b.event_log.poll()
+            assert worker_b.get(7) is None
+            assert worker_b.changed_at == worker_a.changed_at
+        finally:
+            await worker_b.stop()
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncGenerator
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from core.models import Base, TokenBlacklist, User
+from core.utils.write_behind import WriteBehindQueue
+from tests.integration.api.api_v1.auth.mock_data import USER
+
+
+@pytest.fixture
+async def session_factory(tmp_path: Path) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.sqlite3'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with factory() as session:
+        session.add(User(**USER))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+def token_row(index: int) -> dict[str, Any]:
+    return {
+        "jti": f"jti-{index}",
+        "user_id": USER["id"],
+        "token_type": "access",
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def count_rows(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with session_factory() as session:
+        return int(await session.scalar(select(func.count()).select_from(TokenBlacklist)) or 0)
+
+
+class TestWriteBehindQueue:
+    @pytest.mark.asyncio
+    async def test_flush_in_batches(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        queue = WriteBehindQueue(session_factory, TokenBlacklist, batch_size=2)
+        for index in range(5):
+            await queue.put(token_row(index))
+        assert await count_rows(session_factory) == 0
+
+        await queue.flush()
+        assert await count_rows(session_factory) == 5
+        assert queue.stats()["batches_total"] == 3
+        assert len(queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_rows(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        queue = WriteBehindQueue(session_factory, TokenBlacklist, batch_size=100, flush_interval=60)
+        await queue.start()
+        assert queue.running is True
+        await queue.put(token_row(1))
+        await queue.stop()
+        assert queue.running is False
+        assert await count_rows(session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_backpressure_when_full(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        queue = WriteBehindQueue(session_factory, TokenBlacklist, batch_size=10, max_queue=1)
+        await queue.put(token_row(1))
+        blocked = asyncio.create_task(queue.put(token_row(2)))
+        await asyncio.sleep(0.01)
+        assert blocked.done() is False
+
+        await queue.flush()
+        await asyncio.wait_for(blocked, timeout=1)
+        assert len(queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_row_does_not_block_queue(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        queue = WriteBehindQueue(session_factory, TokenBlacklist, batch_size=10, max_queue=3)
+        async with session_factory() as session:
+            session.add(TokenBlacklist(**token_row(2)))
+            await session.commit()
+        for index in range(3):
+            await queue.put(token_row(index))
+
+        await queue.flush()
+        assert len(queue) == 0
+        assert queue.stats()["dropped_total"] == 1
+        assert await count_rows(session_factory) == 3
+        assert await queue.put(token_row(4), timeout=1) is True
+
+    @pytest.mark.asyncio
+    async def test_put_gives_up_after_timeout(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        queue = WriteBehindQueue(session_factory, TokenBlacklist, batch_size=10, max_queue=1)
+        assert await queue.put(token_row(1), timeout=0.01) is True
+        assert await queue.put(token_row(2), timeout=0.01) is False
+        assert len(queue) == 1
@@ -0,0 +1,403 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from argon2 import PasswordHasher
+from fastapi import HTTPException, status
+from pydantic import SecretStr
+from pytest_mock import MockerFixture
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.models import TokenBlacklist, User
+from core.schemas.users import UserProfile
+from core.utils.admission import AdmissionLimiter
+from core.utils.cache import ExpiringLRUCache
+from core.utils.revocation_store import InMemoryRevocationStore
+from core.utils.write_behind import WriteBehindQueue
+from crud.auth import (
+    USER_SNAPSHOTS,
+    ExpiredTokenRecordsPurger,
+    RevokedTokensFilter,
+    create_jwt_record,
+    get_all_users,
+    get_auth_user,
+    get_principal,
+    revoke_all_user_tokens,
+    revoke_token,
+    sync_user_token_cutoffs,
+    verify_password,
+)
+from tests.integration.api.api_v1.auth.mock_data import USER
+
+
+class TestGetAuthUser:
+    @pytest.mark.asyncio
+    async def test_schedules_rehash_for_outdated_hash(self, mocker: MockerFixture) -> None:
+        outdated_hash = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash(USER["password"])
+        user = User(**{**USER, "password": outdated_hash})
+        session = mocker.AsyncMock()
+        session.scalar.return_value = user
+        schedule = mocker.patch("crud.auth.schedule_password_rehash")
+
+        result = await get_auth_user(session, USER["nickname"], SecretStr(USER["password"]))
+        assert result is user
+        schedule.assert_called_once()
+        assert schedule.call_args.args[:2] == (user.id, outdated_hash)
+
+    @pytest.mark.asyncio
+    async def test_wrong_password_does_not_rehash(self, mocker: MockerFixture) -> None:
+        outdated_hash = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash(USER["password"])
+        session = mocker.AsyncMock()
+        session.scalar.return_value = User(**{**USER, "password": outdated_hash})
+        schedule = mocker.patch("crud.auth.schedule_password_rehash")
+
+        with pytest.raises(HTTPException) as exc:
+            await get_auth_user(session, USER["nickname"], SecretStr("wrong_password"))
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+        schedule.assert_not_called()
+
+
+class TestGetPrincipal:
+    @pytest.fixture
+    def revoked_filter(self, mocker: MockerFixture) -> RevokedTokensFilter:
+        revoked_filter = RevokedTokensFilter(capacity=100, error_rate=0.01)
+        revoked_filter.ready = True
+        revoked_filter.add("revoked-jti")
+        mocker.patch("crud.auth.revoked_tokens_filter", revoked_filter)
+        return revoked_filter
+
+    @pytest.mark.asyncio
+    async def test_revocation_and_user_in_one_query(
+        self,
+        mocker: MockerFixture,
+        session: AsyncSession,
+        revoked_filter: RevokedTokensFilter,
+    ) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=3600)
+        mocker.patch("crud.auth.revocation_store", store)
+        USER_SNAPSHOTS.clear()
+        session.add(User(**USER))
+        session.add(TokenBlacklist(jti="revoked-jti", user_id=USER["id"], token_type="access", reason="user_logout"))
+        await session.commit()
+        execute = mocker.spy(session, "execute")
+
+        with pytest.raises(HTTPException) as exc:
+            await get_principal(session, {"jti": "revoked-jti"}, USER["id"])
+        assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+        assert store.is_revoked("revoked-jti") is True
+        assert execute.call_count == 1
+
+        principal = await get_principal(session, {"jti": "fresh-jti"}, USER["id"])
+        assert (principal.id, principal.is_superuser) == (USER["id"], USER["is_superuser"])
+        assert execute.call_count == 2
+        # Отзыв отрицательный по фильтру, а снимок уже в кэше: БД не нужна
+        await get_principal(session, {"jti": "fresh-jti"}, USER["id"])
+        assert execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_full_user_loaded_lazily(self, session: AsyncSession, revoked_filter: RevokedTokensFilter) -> None:
+        USER_SNAPSHOTS.clear()
+        session.add(User(**USER))
+        await session.commit()
+
+        principal = await get_principal(session, {"jti": "fresh-jti"}, USER["id"])
+        user = await principal.get_user(session)
+        assert user.password == USER["password"]
+        assert await principal.get_user(session) is user
+
+    @pytest.mark.asyncio
+    async def test_unknown_user(self, session: AsyncSession, revoked_filter: RevokedTokensFilter) -> None:
+        USER_SNAPSHOTS.clear()
+        with pytest.raises(HTTPException) as exc:
+            await get_principal(session, {"jti": "fresh-jti"}, 404)
+        assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_snapshot_invalidated_after_commit(
+        self,
+        session: AsyncSession,
+        revoked_filter: RevokedTokensFilter,
+    ) -> None:
+        USER_SNAPSHOTS.clear()
+        user = User(**USER)
+        session.add(user)
+        await session.commit()
+        await get_principal(session, {"jti": "fresh-jti"}, USER["id"])
+
+        user.first_name = "Renamed"
+        await session.flush()
+        assert (await get_principal(session, {"jti": "fresh-jti"}, USER["id"])).profile.first_name == USER["first_name"]
+        await session.commit()
+        assert (await get_principal(session, {"jti": "fresh-jti"}, USER["id"])).profile.first_name == "Renamed"
+
+        await session.execute(update(User).where(User.id == USER["id"]).values(is_active=False))
+        await session.commit()
+        with pytest.raises(HTTPException) as exc:
+            await get_principal(session, {"jti": "fresh-jti"}, USER["id"])
+        assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+
+    @pytest.mark.asyncio
+    async def test_rollback_keeps_snapshot(self, session: AsyncSession, revoked_filter: RevokedTokensFilter) -> None:
+        USER_SNAPSHOTS.clear()
+        session.add(User(**USER))
+        await session.commit()
+        await get_principal(session, {"jti": "fresh-jti"}, USER["id"])
+
+        await session.execute(update(User).where(User.id == USER["id"]).values(nickname="renamed"))
+        await session.rollback()
+        assert USER_SNAPSHOTS.get(USER["id"]) is not None
+
+    @pytest.mark.asyncio
+    async def test_filter_negative_skips_database(
+        self,
+        mocker: MockerFixture,
+        revoked_filter: RevokedTokensFilter,
+    ) -> None:
+        session = mocker.AsyncMock()
+        profile = UserProfile.model_validate(USER)
+
+        principal = await get_principal(session, {"jti": "fresh-jti"}, USER["id"], profile)
+        assert principal.profile is profile
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_filter_not_ready_checks_database(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        mocker.patch("crud.auth.revoked_tokens_filter", RevokedTokensFilter(capacity=100, error_rate=0.01))
+        session.add(User(**USER))
+        await session.commit()
+        execute = mocker.spy(session, "execute")
+
+        await get_principal(session, {"jti": "fresh-jti"}, USER["id"], UserProfile.model_validate(USER))
+        execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_access_token_revoked_through_family(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        mocker.patch("crud.auth.revoked_tokens_filter", RevokedTokensFilter(capacity=100, error_rate=0.01))
+        mocker.patch(
+            "crud.auth.revocation_store", InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=3600)
+        )
+        session.add(User(**USER))
+        session.add(TokenBlacklist(jti="family-jti", user_id=USER["id"], token_type="refresh", reason="user_logout"))
+        await session.commit()
+
+        await get_principal(session, {"jti": "access-jti"}, USER["id"])
+        with pytest.raises(HTTPException) as exc:
+            await get_principal(session, {"jti": "access-jti", "fid": "family-jti"}, USER["id"])
+        assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestRevokedTokensFilter:
+    @pytest.mark.asyncio
+    async def test_filter_rebuild_and_sync(self, session: AsyncSession) -> None:
+        session.add(User(**USER))
+        session.add(TokenBlacklist(jti="revoked-jti", user_id=USER["id"], token_type="access", reason="user_logout"))
+        session.add(TokenBlacklist(jti="active-jti", user_id=USER["id"], token_type="access"))
+        await session.commit()
+
+        revoked_filter = RevokedTokensFilter(capacity=100, error_rate=0.001)
+        await revoked_filter.rebuild(session)
+        assert revoked_filter.ready is True
+        assert revoked_filter.might_contain("revoked-jti") is True
+        assert revoked_filter.might_contain("active-jti") is False
+
+        await session.execute(
+            update(TokenBlacklist)
+            .where(TokenBlacklist.jti == "active-jti")
+            .values(reason="admin", revoked_at=datetime.now(timezone.utc)),
+        )
+        await session.commit()
+        await revoked_filter.sync(session)
+        assert revoked_filter.might_contain("active-jti") is True
+
+
+class TestGetAllUsers:
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self, session: AsyncSession) -> None:
+        for user_id in range(1, 6):
+            session.add(
+                User(**{**USER, "id": user_id, "nickname": f"user_{user_id}", "email": f"{user_id}@example.com"})
+            )
+        await session.commit()
+
+        first_page = await get_all_users(session, limit=2)
+        assert [user.id for user in first_page] == [1, 2]
+        next_page = await get_all_users(session, limit=2, after_id=first_page[-1].id)
+        assert [user.id for user in next_page] == [3, 4]
+        assert [user.id for user in await get_all_users(session, limit=2, after_id=4)] == [5]
+
+
+class TestVerifyPassword:
+    @pytest.mark.asyncio
+    async def test_verify_password_overloaded(self, mocker: MockerFixture) -> None:
+        limiter = AdmissionLimiter(max_concurrency=1, max_queue=0)
+        mocker.patch("crud.auth.verification_limiter", limiter)
+
+        async with limiter.slot():
+            with pytest.raises(HTTPException) as exc:
+                await verify_password("hash", "password")
+        assert exc.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert exc.value.headers == {"Retry-After": "1"}
+
+
+class TestRevokeToken:
+    @pytest.mark.asyncio
+    async def test_revoke_unpersisted_access_token(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        revoke = mocker.patch("crud.auth.revocation_store.revoke")
+        session.add(User(**USER))
+        await session.commit()
+
+        await revoke_token(session, "access-jti", user_id=USER["id"], expires_at=1234.0)
+        token = await session.scalar(select(TokenBlacklist).where(TokenBlacklist.jti == "access-jti"))
+        assert token is not None
+        assert token.reason == "user_logout"
+        assert token.revoked_at is not None
+        revoke.assert_called_once_with("access-jti", 1234.0)
+
+    @pytest.mark.asyncio
+    async def test_revoke_unknown_token(self, session: AsyncSession) -> None:
+        with pytest.raises(HTTPException) as exc:
+            await revoke_token(session, "unknown-jti")
+        assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_revoke_token_still_in_write_behind_queue(
+        self,
+        mocker: MockerFixture,
+        session: AsyncSession,
+    ) -> None:
+        mocker.patch("crud.auth.revocation_store.revoke")
+        session.add(User(**USER))
+        await session.commit()
+        writer = WriteBehindQueue(
+            async_sessionmaker(session.bind, expire_on_commit=False),
+            TokenBlacklist,
+            flush_interval=60,
+        )
+        mocker.patch("crud.auth.token_record_writer", writer)
+        await writer.start()
+
+        await create_jwt_record(session, "queued-jti", USER["id"], "refresh")
+        assert len(writer) == 1
+
+        await revoke_token(session, "queued-jti")
+        await writer.stop()
+        token = await session.scalar(select(TokenBlacklist).where(TokenBlacklist.jti == "queued-jti"))
+        assert token is not None
+        assert token.token_type == "refresh"
+        assert token.reason == "user_logout"
+
+
+class TestRevokeAllUserTokens:
+    @pytest.mark.asyncio
+    async def test_bulk_revoke_sets_user_cutoff(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=3600)
+        mocker.patch("crud.auth.revocation_store", store)
+        issued_earlier = datetime.now(timezone.utc) - timedelta(minutes=5)
+        session.add(User(**USER))
+        session.add(
+            TokenBlacklist(jti="old-access", user_id=USER["id"], token_type="access", created_at=issued_earlier)
+        )
+        session.add(
+            TokenBlacklist(jti="old-refresh", user_id=USER["id"], token_type="refresh", created_at=issued_earlier)
+        )
+        await session.commit()
+
+        await revoke_all_user_tokens(session, USER["id"])
+        reasons = await session.scalars(select(TokenBlacklist.reason).where(TokenBlacklist.user_id == USER["id"]))
+        assert set(reasons) == {"user_logout"}
+        valid_after = await session.scalar(select(User.tokens_valid_after).where(User.id == USER["id"]))
+        assert valid_after is not None
+        # Старые токены отсекаются по iat, без отдельной записи в кэше на каждый JTI
+        with pytest.raises(HTTPException) as exc:
+            await get_principal(session, {"jti": "other-jti", "iat": time.time() - 60}, USER["id"])
+        assert exc.value.status_code == status.HTTP_403_FORBIDDEN
+        assert len(store.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_same_second_tokens_revoked_by_jti(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=3600)
+        mocker.patch("crud.auth.revocation_store", store)
+        session.add(User(**USER))
+        session.add(
+            TokenBlacklist(
+                jti="fresh-refresh",
+                user_id=USER["id"],
+                token_type="refresh",
+                created_at=datetime.now(timezone.utc),
+            ),
+        )
+        await session.commit()
+
+        await revoke_all_user_tokens(session, USER["id"])
+        assert store.is_revoked("fresh-refresh") is True
+
+    @pytest.mark.asyncio
+    async def test_sync_user_token_cutoffs(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        store = InMemoryRevocationStore(ExpiringLRUCache(maxsize=10), cutoff_ttl=3600)
+        mocker.patch("crud.auth.revocation_store", store)
+        valid_after = datetime.now(timezone.utc)
+        session.add(User(**{**USER, "tokens_valid_after": valid_after}))
+        await session.commit()
+
+        await sync_user_token_cutoffs(session)
+        assert store.user_cutoffs == {USER["id"]: pytest.approx(valid_after.timestamp())}
+
+
+class TestCreateJWTRecord:
+    @pytest.mark.asyncio
+    async def test_records_share_one_commit(self, mocker: MockerFixture, session: AsyncSession) -> None:
+        session.add(User(**USER))
+        await session.commit()
+        commit = mocker.spy(session, "commit")
+
+        await create_jwt_record(session, "access-jti", USER["id"], "access", commit=False)
+        await create_jwt_record(session, "refresh-jti", USER["id"], "refresh", commit=False)
+        assert commit.call_count == 0
+        await session.commit()
+
+        tokens = await session.scalars(select(TokenBlacklist.jti).order_by(TokenBlacklist.id))
+        assert list(tokens) == ["access-jti", "refresh-jti"]
+
+
+class TestExpiredTokenRecordsPurger:
+    @pytest.mark.asyncio
+    async def test_purges_expired_rows_in_batches(self, session: AsyncSession) -> None:
+        now = datetime.now(timezone.utc)
+        session.add(User(**USER))
+        for number in range(5):
+            session.add(
+                TokenBlacklist(
+                    jti=f"expired-{number}",
+                    user_id=USER["id"],
+                    token_type="access",
+                    created_at=now - timedelta(hours=1),
+                    expires_at=now - timedelta(minutes=1),
+                ),
+            )
+        session.add(
+            TokenBlacklist(
+                jti="live",
+                user_id=USER["id"],
+                token_type="refresh",
+                created_at=now,
+                expires_at=now + timedelta(days=1),
+            ),
+        )
+        session.add(
+            TokenBlacklist(
+                jti="legacy",
+                user_id=USER["id"],
+                token_type="refresh",
+                created_at=now - timedelta(days=365),
+            ),
+        )
+        await session.commit()
+        purger = ExpiredTokenRecordsPurger(async_sessionmaker(session.bind, expire_on_commit=False), batch_size=2)
+
+        assert await purger.purge() == 6
+        remaining = await session.scalars(select(TokenBlacklist.jti))
+        assert list(remaining) == ["live"]
+        assert purger.stats()["purged_total"] == 6
+        assert await purger.purge() == 0
+        assert purger.stats()["runs_total"] == 2
@@ -0,0 +1,34 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.models import User
+from crud.users import stream_users
+from tests.integration.api.api_v1.auth.mock_data import USER
+
+
+class TestStreamUsers:
+    @pytest.mark.asyncio
+    async def test_streams_users_in_id_order(self, session: AsyncSession) -> None:
+        for user_id in (3, 1, 2):
+            session.add(
+                User(**{**USER, "id": user_id, "nickname": f"user_{user_id}", "email": f"{user_id}@example.com"})
+            )
+        await session.commit()
+
+        statements: list[str] = []
+
+        def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+            statements.append(statement)
+
+        assert session.bind is not None
+        sync_engine = session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+        session_factory = async_sessionmaker(session.bind, expire_on_commit=False)
+        rows = [row async for row in stream_users(session_factory, ["id", "nickname"], chunk_size=2)]
+        event.remove(sync_engine, "before_cursor_execute", record)
+        assert rows == [{"id": user_id, "nickname": f"user_{user_id}"} for user_id in (1, 2, 3)]
+        # Из таблицы читаются только выгружаемые столбцы, без хеша пароля
+        assert statements and all("password" not in statement for statement in statements)